@@ -0,0 +1,594 @@
+import time
+import random
+from game import Game
+from bitboard import Position, window_masks
+from evaluation import IncrementalEvaluator
+from book import OpeningBook
+from solver import EndgameSolver, SolverTimeout
+from mcts import MCTS
+from instrumentation import SearchStats, start_profiler, stop_profiler
+from transposition import TranspositionTable, SharedTranspositionTable, EXACT, LOWER, UPPER
+
+WIN_SCORE = 1000000  # Score of a win on the spot; a win n plies from the root scores WIN_SCORE - n
+WIN_BOUND = WIN_SCORE // 2  # Scores beyond this are proven wins, or proven losses when negative
+
+
+class SearchTimeout(Exception):
+    """Raised inside minimax when the time budget of the current move runs out."""
+
+
+def score_to_table(score, ply):
+    """Make a win or loss score count plies from the stored position instead of from the root."""
+    if score >= WIN_BOUND:
+        return score + ply
+    if score <= -WIN_BOUND:
+        return score - ply
+    return score
+
+
+def score_from_table(score, ply):
+    """Make a stored win or loss score count plies from the root again."""
+    if score >= WIN_BOUND:
+        return score - ply
+    if score <= -WIN_BOUND:
+        return score + ply
+    return score
+
+
+class AIPlayer(Game):
+    """Class representing the AI player."""
+
+    def __init__(self, row_count, col_count, ai_piece, difficulty, pruning, depth, tt_memory_mb=16, time_limit_ms=None, search='minimax', workers=1, parallel='root', book_path=None, endgame_threshold=14, instrument=False, profile=None, playouts=2000, tactics=True, win_length=4):
+        """Initialize the AIPlayer."""
+        self.row_count = row_count  # Set the number of rows in the game board
+        self.col_count = col_count  # Set the number of columns in the game board
+        self.win_length = win_length  # Set the number of pieces in a row that wins
+        self.ai_piece = ai_piece  # Set the piece of the AI
+        self.opponent_piece = 1 if ai_piece == 2 else 2  # Set the piece of the opponent
+        self.difficulty = difficulty # Set the Diffculty of the AI
+        self.pruning = pruning  # Set the Pruning of the AI
+        self.depth = depth #Set the depth of Minimax
+        self.time_limit_ms = time_limit_ms  # Set the time budget per move (None searches to the fixed depth)
+        self.deadline = None  # perf_counter time at which the running search must stop
+        self.pv_moves = {}  # Principal variation of the last completed iteration, keyed by position
+        self.search = search  # Set the search algorithm: 'minimax', 'pvs' (negamax with principal variation search) or 'mcts'
+        self.playouts = playouts  # Playouts per move of Monte Carlo tree search when there is no time budget
+        self.mcts = MCTS(row_count, col_count) if search == 'mcts' else None  # Search tree, reused between moves
+        self.center_order = sorted(range(col_count), key=lambda col: abs(col - col_count // 2))  # Columns from the center outwards
+        self.killer_moves = []  # Two moves per ply that recently caused a cutoff
+        self.history = [[0] * (col_count * (row_count + 1)) for _ in range(2)]  # Cutoff history of each player per bit index
+        self.total_nodes_evaluated = 0  # Initialize the count of nodes evaluated
+        self.nodes_count = []  # Initialize the list of nodes count
+        self.execution_times = []  # Initialize the list of execution times
+        self.depths_reached = []  # Initialize the list of search depths reached
+        self.scores = []  # Initialize the list of root scores, from the AI's point of view (None for moves without one)
+        self.win_rates = []  # Initialize the list of Monte Carlo win rates between 0 and 1 (None for moves MCTS did not choose)
+        self.tt_memory_mb = tt_memory_mb  # Set the memory cap of the transposition table
+        self.workers = workers  # Set the number of search processes
+        self.parallel = parallel  # Set the parallel search mode: 'root' or 'lazy'
+        if tt_memory_mb and workers > 1 and parallel == 'lazy':  # Lazy SMP helpers share the table through shared memory
+            self.transposition_table = SharedTranspositionTable(tt_memory_mb)
+        else:
+            self.transposition_table = TranspositionTable(tt_memory_mb) if tt_memory_mb else None  # Kept across moves so later searches reuse earlier results
+        self.tt_stats = []  # Initialize the list of transposition table stats
+        self.evaluator = IncrementalEvaluator(row_count, col_count, self.give_score, win_length=win_length)  # Running evaluation updated on every move
+        self.book_path = book_path  # Path of the opening book, if any
+        self.book = OpeningBook(book_path) if book_path else None  # Memory-mapped opening book, if any
+        self.endgame_threshold = endgame_threshold  # Solve exactly once at most this many cells are empty (0 disables it)
+        self.solver = EndgameSolver(row_count, col_count, tt_memory_mb or 16) if endgame_threshold else None  # Keeps proven results for the whole game
+        self.endgame_stats = []  # Initialize the list of endgame solver stats (None for moves it did not solve)
+        self.tactics = tactics  # Play immediate wins, forced blocks and only safe moves without searching
+        self.tactical_moves = []  # Initialize the list of tactical shortcuts taken ('win', 'block', 'only_safe' or None)
+        self.instrument = instrument  # Collect SearchStats for every move
+        self.profile = profile  # Profiler run around every move: 'cprofile', 'sample' or None
+        self.stats = None  # SearchStats of the running search, None when not instrumented
+        self.search_stats = []  # Initialize the list of per-move SearchStats (None for moves without stats)
+        self.stop_flag = None  # Shared flag that stops the search of a parallel worker
+        self.parallel_search = None  # Worker processes of the parallel search, if enabled
+        if workers > 1:
+            if search == 'mcts':
+                raise ValueError("parallel search is not available for Monte Carlo tree search")
+            from parallel import ParallelSearch  # parallel.py imports this module
+            self.parallel_search = ParallelSearch(self, workers, parallel)
+
+    def give_score(self, ai_pieces_count, empty_spaces):
+        """Calculate the score of a window from its AI piece and empty space counts."""
+        score = 0  # Initialize score
+        missing = self.win_length - ai_pieces_count  # Pieces the AI still needs to complete the window
+        if 2 <= ai_pieces_count and 1 <= missing == empty_spaces:  # If AI has two or more pieces and the rest of the window is empty
+            score += 10 >> (missing - 1)  # 10 when one piece is missing, halved for every further missing piece
+        return score  # Return the calculated score
+
+    def evaluate_state(self, position):
+        """Evaluate the current state of the position."""
+        ai_pieces = position.bitboards[self.ai_piece - 1]  # Bitboard of the AI's pieces
+        empty = ~(position.bitboards[0] | position.bitboards[1])  # Bitboard of the empty cells
+        center_col = self.col_count // 2
+        center_mask = ((1 << self.row_count) - 1) << (center_col * position.stride)  # Bitboard of the center column
+        score = bin(ai_pieces & center_mask).count('1') * 4  # Increase score based on AI's pieces in the center
+
+        for window in window_masks(self.row_count, self.col_count, self.win_length):  # Loop through every window of win_length cells
+            score += self.give_score(bin(ai_pieces & window).count('1'), bin(empty & window).count('1'))  # Calculate score based on the pieces in the window
+
+        return score  # Return the evaluated score
+
+    def valid_moves(self, position):
+        """Return a list of valid moves."""
+        return position.valid_moves()  # Columns that are not full, from left to right
+
+    def check_win(self, position, col_num, row_num):
+        """Check for a win condition through the last move on the position."""
+        if col_num == None or row_num == None:  # If no move has been played yet
+            return False, None  # Return False for no win and no winner
+        piece = position.piece_at(row_num, col_num)  # Piece of the player who made the last move
+        if piece and position.has_won(piece):  # If that player has a winning line
+            return True, piece  # Return True for win and the winner's piece value
+        return False, None  # Return False for no win, and no winner's piece value
+
+    def is_terminal_node(self, position, col_num, row_num):
+        """Check if the current node is terminal."""
+        if col_num != None:
+          win, _ = self.check_win(position, col_num, row_num)  # Check for win
+          return win or position.is_full()  # Return True if win or no valid moves left
+        return position.is_full()
+
+    def minimax(self, position, depth, alpha, beta, maximizingPlayer, col_num, row_num):
+        """Implementation of the minimax algorithm."""
+        if self.deadline is not None and self.search_stopped():  # If the time budget ran out
+            raise SearchTimeout()
+        self.total_nodes_evaluated += 1  # Increment the count of nodes evaluated
+        stats = self.stats
+        if stats is not None:
+            stats.node(len(position.moves))  # The position's move stack starts empty at the root
+        valid_moves = self.valid_moves(position)  # Get valid moves
+        is_terminal = self.is_terminal_node(position, col_num, row_num)  # Check if terminal node reached
+
+        if depth == 0 or is_terminal:  # If maximum depth reached or terminal node
+            if stats is not None:
+                stats.leaf_nodes += 1
+            if is_terminal:  # If terminal node
+                _, winner = self.check_win(position, col_num, row_num)  # Check for winner
+                if winner ==  self.ai_piece:  # If AI wins
+                    return WIN_SCORE - len(position.moves), None  # Quicker wins score higher
+                elif winner == self.opponent_piece:  # If other player wins
+                    return len(position.moves) - WIN_SCORE, None  # Later losses score higher
+                else:  # If draw
+                    return 0, None  # Return a neutral score
+            elif position.evaluator is not None:  # If maximum depth reached and the evaluation is kept up to date
+                return position.evaluator.evaluate(self.ai_piece), None  # Read the running score
+            else:  # If maximum depth reached
+                return self.evaluate_state(position), None  # Evaluate the state and return the score
+
+        table = self.transposition_table
+        ply = len(position.moves)
+        ordered_move = self.pv_moves.get(position.key) if self.pv_moves else None  # Previous iteration's principal variation move
+        if table is not None:  # Look the position up in the transposition table
+            entry = table.probe(position.key)
+            if entry is not None:
+                _, entry_depth, entry_score, entry_flag, entry_move = entry
+                entry_score = score_from_table(entry_score, ply)
+                if entry_depth >= depth:  # If the stored search was at least as deep
+                    if entry_flag == EXACT:
+                        if stats is not None:
+                            stats.tt_cutoffs += 1
+                        return entry_score, entry_move
+                    if self.pruning:
+                        if entry_flag == LOWER:
+                            alpha = max(alpha, entry_score)
+                        else:
+                            beta = min(beta, entry_score)
+                        if alpha >= beta:  # If the stored bound already causes a cutoff
+                            if stats is not None:
+                                stats.tt_cutoffs += 1
+                            return entry_score, entry_move
+                if ordered_move is None:
+                    ordered_move = entry_move
+        if ordered_move in valid_moves:  # Try the principal variation or stored best move first
+            valid_moves.remove(ordered_move)
+            valid_moves.insert(0, ordered_move)
+        alpha_start, beta_start = alpha, beta  # Window at entry, used to classify the result
+
+        if maximizingPlayer:  # If AI's turn
+            max_score = float('-inf')  # Initialize max score
+            best_move = random.choice(valid_moves)  # Randomly choose a move initially
+            for index, col in enumerate(valid_moves):  # Loop through valid moves
+                expected_row = position.make_move(col, self.ai_piece)  # Play the move on the position
+                score = self.minimax(position, depth - 1, alpha, beta, False, col, expected_row)[0]  # Recursively call minimax for the next state
+                position.unmake_move()  # Take the move back
+                if score > max_score:  # If higher score found
+                    max_score = score  # Update max score
+                    best_move = col  # Update best move
+                alpha = max(alpha, max_score)  # Update alpha value
+                if self.pruning: #If alpha-beta pruning is enabled
+                  if alpha >= beta:  # If alpha cutoff occurs
+                      if stats is not None:
+                          stats.cutoff(len(position.moves), index)
+                      break  # Break the loop
+            if stats is not None:
+                stats.interior(index + 1)
+            if table is not None:  # Store the result with its bound type
+                flag = EXACT
+                if self.pruning and max_score <= alpha_start:
+                    flag = UPPER
+                elif self.pruning and max_score >= beta_start:
+                    flag = LOWER
+                table.store(position.key, depth, score_to_table(max_score, ply), flag, best_move)
+            return max_score, best_move  # Return max score and best move
+        else:  # If other player's turn
+            min_score = float('inf')  # Initialize min score
+            best_move = random.choice(valid_moves)  # Randomly choose a move initially
+            for index, col in enumerate(valid_moves):  # Loop through valid moves
+                expected_row = position.make_move(col, self.opponent_piece)  # Play the move on the position
+                score = self.minimax(position, depth - 1, alpha, beta, True, col, expected_row)[0]  # Recursively call minimax for the next state
+                position.unmake_move()  # Take the move back
+                if score < min_score:  # If lower score found
+                    min_score = score  # Update min score
+                    best_move = col  # Update best move
+                if self.pruning: #If alpha-beta pruning is enabled
+                  beta = min(beta, min_score)  # Update beta value
+                  if alpha >= beta:  # If beta cutoff occurs
+                      if stats is not None:
+                          stats.cutoff(len(position.moves), index)
+                      break  # Break the loop
+            if stats is not None:
+                stats.interior(index + 1)
+            if table is not None:  # Store the result with its bound type
+                flag = EXACT
+                if self.pruning and min_score >= beta_start:
+                    flag = LOWER
+                elif self.pruning and min_score <= alpha_start:
+                    flag = UPPER
+                table.store(position.key, depth, score_to_table(min_score, ply), flag, best_move)
+            return min_score, best_move  # Return min score and best move
+
+    def order_moves(self, position, piece, ply, first_move):
+        """Order the valid moves: hash/PV move, killer moves, then by history with the center first."""
+        moves = [col for col in self.center_order if position.can_play(col)]  # Center-first base order
+        history = self.history[piece - 1]
+        heights = position.heights
+        moves.sort(key=lambda col: -history[heights[col]])  # Stable sort keeps center first among equal history
+        if ply < len(self.killer_moves):
+            for killer in reversed(self.killer_moves[ply]):
+                if killer in moves:
+                    moves.remove(killer)
+                    moves.insert(0, killer)
+        if first_move in moves:
+            moves.remove(first_move)
+            moves.insert(0, first_move)
+        return moves
+
+    def negamax(self, position, depth, alpha, beta, piece, col_num, row_num, ply=0):
+        """Negamax with principal variation search; scores are from the point of view of the piece to move."""
+        if self.deadline is not None and self.search_stopped():  # If the time budget ran out
+            raise SearchTimeout()
+        self.total_nodes_evaluated += 1  # Increment the count of nodes evaluated
+        stats = self.stats
+        if stats is not None:
+            stats.node(ply)
+
+        if col_num != None and row_num != None and position.has_won(3 - piece):  # If the previous move won
+            if stats is not None:
+                stats.leaf_nodes += 1
+            return ply - WIN_SCORE, None  # The piece to move has lost; later losses score higher
+        if position.is_full():  # If draw
+            if stats is not None:
+                stats.leaf_nodes += 1
+            return 0, None
+        if depth == 0:  # If maximum depth reached
+            if stats is not None:
+                stats.leaf_nodes += 1
+            if position.evaluator is not None:
+                score = position.evaluator.evaluate(self.ai_piece)
+            else:
+                score = self.evaluate_state(position)
+            return (score if piece == self.ai_piece else -score), None  # The evaluation is from the AI's point of view
+
+        table = self.transposition_table
+        first_move = self.pv_moves.get(position.key) if self.pv_moves else None  # Previous iteration's principal variation move
+        if table is not None:  # Look the position up in the transposition table
+            entry = table.probe(position.key)
+            if entry is not None:
+                _, entry_depth, entry_score, entry_flag, entry_move = entry
+                entry_score = score_from_table(entry_score, ply)
+                if entry_depth >= depth:  # If the stored search was at least as deep
+                    if entry_flag == EXACT:
+                        if stats is not None:
+                            stats.tt_cutoffs += 1
+                        return entry_score, entry_move
+                    if entry_flag == LOWER:
+                        alpha = max(alpha, entry_score)
+                    else:
+                        beta = min(beta, entry_score)
+                    if alpha >= beta:  # If the stored bound already causes a cutoff
+                        if stats is not None:
+                            stats.tt_cutoffs += 1
+                        return entry_score, entry_move
+                if first_move is None:
+                    first_move = entry_move
+        alpha_start = alpha  # Lower end of the window at entry, used to classify the result
+
+        while len(self.killer_moves) <= ply:
+            self.killer_moves.append([None, None])
+        moves = self.order_moves(position, piece, ply, first_move)
+        opponent = 3 - piece
+        best_score = float('-inf')
+        best_move = moves[0]
+        for index, col in enumerate(moves):
+            expected_row = position.make_move(col, piece)  # Play the move on the position
+            if index == 0 or alpha == float('-inf'):  # Search the expected best move (or any move before a bound exists) with the full window
+                score = -self.negamax(position, depth - 1, -beta, -alpha, opponent, col, expected_row, ply + 1)[0]
+            else:  # Prove the other moves are worse with a null window
+                score = -self.negamax(position, depth - 1, -alpha - 1, -alpha, opponent, col, expected_row, ply + 1)[0]
+                if alpha < score < beta:  # If the move may be better, search it again with the full window
+                    score = -self.negamax(position, depth - 1, -beta, -alpha, opponent, col, expected_row, ply + 1)[0]
+            position.unmake_move()  # Take the move back
+            if score > best_score:
+                best_score = score
+                best_move = col
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:  # If a cutoff occurs
+                killers = self.killer_moves[ply]
+                if killers[0] != col:  # Remember the move that caused the cutoff
+                    killers[1] = killers[0]
+                    killers[0] = col
+                self.history[piece - 1][position.heights[col]] += depth * depth
+                if stats is not None:
+                    stats.cutoff(ply, index)
+                break
+        if stats is not None:
+            stats.interior(index + 1)
+
+        if table is not None:  # Store the result with its bound type
+            flag = EXACT
+            if best_score <= alpha_start:
+                flag = UPPER
+            elif best_score >= beta:
+                flag = LOWER
+            table.store(position.key, depth, score_to_table(best_score, ply), flag, best_move)
+        return best_score, best_move
+
+    def gives_win(self, position, col):
+        """Check if playing the column lets the opponent win by playing on top of it."""
+        position.make_move(col, self.ai_piece)
+        gives_win = position.can_play(col) and position.is_winning_move(col, self.opponent_piece)
+        position.unmake_move()
+        return gives_win
+
+    def tactical_move(self, position):
+        """
+        Look for a move that tactics alone decide, before any search.
+
+        Parameters:
+            position (Position): The position with the AI to move.
+
+        Returns:
+            tuple: The move and why it is forced ('win', 'block' or 'only_safe'), or None if a search must decide.
+        """
+        moves = [col for col in self.center_order if position.can_play(col)]
+        for col in moves:  # Win on the spot
+            if position.is_winning_move(col, self.ai_piece):
+                return col, 'win'
+        for col in moves:  # Block the opponent's win; with two threats the game is lost whichever one is blocked
+            if position.is_winning_move(col, self.opponent_piece):
+                return col, 'block'
+        safe_moves = [col for col in moves if not self.gives_win(position, col)]
+        if len(safe_moves) == 1:  # Every other move hands the opponent a win
+            return safe_moves[0], 'only_safe'
+        return None
+
+    def search_stopped(self):
+        """Check if the deadline has passed or a parallel search asked this worker to stop."""
+        return time.perf_counter() >= self.deadline or (self.stop_flag is not None and self.stop_flag.value)
+
+    def mcts_search(self, position):
+        """Search with Monte Carlo tree search, with a playout or time budget scaled by the difficulty."""
+        budget_shares = {'Easy': 0.05, 'Medium': 0.25, 'Hard': 1}  # Share of the full budget used at each difficulty
+        share = budget_shares[self.difficulty]
+        if self.time_limit_ms is not None:
+            move, value = self.mcts.search(position, self.ai_piece, deadline=time.perf_counter() + share * self.time_limit_ms / 1000,
+                                           stop_flag=self.stop_flag)
+        else:
+            move, value = self.mcts.search(position, self.ai_piece, max(1, int(share * self.playouts)), stop_flag=self.stop_flag)
+        self.total_nodes_evaluated += self.mcts.playouts  # One playout per visited leaf
+        return (value, move), self.mcts.max_depth
+
+    def predict_reply(self, board):
+        """Return the opponent's expected reply on the board from the stored search results, or None."""
+        position = Position.from_board(board, self.win_length)
+        if self.mcts is not None:
+            return self.mcts.predict_reply(position.key)
+        for table in (self.transposition_table, self.solver.table if self.solver is not None else None):
+            move = table.best_move(position.key) if table is not None else None
+            if move is not None and position.can_play(move):
+                return move
+        return None
+
+    def worker_config(self):
+        """Return the constructor arguments of an equivalent sequential AI player for a worker process."""
+        return {'row_count': self.row_count, 'col_count': self.col_count, 'ai_piece': self.ai_piece,
+                'difficulty': self.difficulty, 'pruning': self.pruning, 'depth': self.depth,
+                'tt_memory_mb': self.tt_memory_mb, 'search': self.search, 'win_length': self.win_length}
+
+    def player_config(self):
+        """Return every constructor argument of this AI player except its piece, describing how it plays."""
+        return {'row_count': self.row_count, 'col_count': self.col_count, 'win_length': self.win_length,
+                'difficulty': self.difficulty, 'pruning': self.pruning, 'depth': self.depth,
+                'tt_memory_mb': self.tt_memory_mb, 'time_limit_ms': self.time_limit_ms, 'search': self.search,
+                'workers': self.workers, 'parallel': self.parallel, 'book_path': self.book_path,
+                'endgame_threshold': self.endgame_threshold, 'instrument': self.instrument, 'profile': self.profile,
+                'playouts': self.playouts, 'tactics': self.tactics}
+
+    def close(self):
+        """Stop the worker processes of the parallel search and unmap the opening book, if any."""
+        if self.parallel_search is not None:
+            self.parallel_search.close()
+            self.parallel_search = None
+        if self.book is not None:
+            self.book.close()
+            self.book = None
+
+    def search_root(self, position, depth, col_num, row_num):
+        """Search the position to the given depth, in parallel when workers are enabled."""
+        if self.parallel_search is not None:
+            return self.parallel_search.search(self, position, depth, col_num, row_num)
+        return self.sequential_search(position, depth, col_num, row_num)
+
+    def sequential_search(self, position, depth, col_num, row_num):
+        """Search the position to the given depth with the configured algorithm in this process."""
+        if self.search == 'pvs':
+            return self.negamax(position, depth, float('-inf'), float('inf'), self.ai_piece, col_num, row_num)
+        return self.minimax(position, depth, float('-inf'), float('inf'), True, col_num, row_num)
+
+    def principal_variation(self, position, best_move):
+        """Return the principal variation from the position, keyed by the position each move is played in."""
+        pv_moves = {}
+        piece = self.ai_piece
+        col = best_move
+        while col is not None and position.can_play(col):  # Follow the stored best moves
+            pv_moves[position.key] = col
+            position.make_move(col, piece)
+            if position.has_won(piece) or self.transposition_table is None:
+                break
+            col = self.transposition_table.best_move(position.key)
+            piece = self.opponent_piece if piece == self.ai_piece else self.ai_piece
+        for _ in range(len(pv_moves)):  # Take the variation back
+            position.unmake_move()
+        return pv_moves
+
+    def iterative_deepening(self, position, col_num, row_num, deadline=None):
+        """Search one ply deeper at a time until the time budget, or the given perf_counter deadline, runs out."""
+        self.deadline = float('inf') if self.stop_flag is not None else None  # Always finish the first iteration unless asked to stop
+        if deadline is None:
+            deadline = time.perf_counter() + self.time_limit_ms / 1000  # Time at which the search must stop
+        max_depth = self.row_count * self.col_count - position.piece_count()  # Deeper searches cannot see anything new
+        result, depth_reached = None, 0
+        self.pv_moves = {}
+        for depth in range(1, max_depth + 1):
+            try:
+                iteration = self.search_root(position, depth, col_num, row_num)
+            except SearchTimeout:  # Discard the unfinished iteration
+                while position.moves:  # Take back the moves of the interrupted search
+                    position.unmake_move()
+                if result is None:  # Stopped through the stop flag before any iteration finished
+                    self.deadline, self.pv_moves = None, {}
+                    raise
+                break
+            result, depth_reached = iteration, depth
+            if abs(result[0]) >= WIN_BOUND or time.perf_counter() >= deadline:  # If the result is proven or time is up
+                break
+            self.pv_moves = self.principal_variation(position, result[1])  # Search the best line first next iteration
+            self.deadline = deadline
+        self.deadline = None
+        self.pv_moves = {}
+        return result, depth_reached
+
+    def solve_endgame(self, position):
+        """
+        Solve the position exactly with the endgame solver.
+
+        With a time budget the solver gets half of it, leaving the rest for the normal search.
+
+        Returns:
+            tuple: The (score, move) result on the WIN_SCORE scale and the solver stats, or None
+            if the solver ran out of time.
+        """
+        solve_start = time.time()
+        deadline = time.perf_counter() + self.time_limit_ms / 2000 if self.time_limit_ms is not None else None
+        try:
+            move, score = self.solver.solve(position, self.ai_piece, deadline, self.stop_flag)
+        except SolverTimeout:
+            while position.moves:  # Take back the moves of the interrupted solve
+                position.unmake_move()
+            self.total_nodes_evaluated += self.solver.nodes
+            if self.stop_flag is not None and self.stop_flag.value:  # Asked to stop rather than out of time
+                raise SearchTimeout()
+            return None
+        self.total_nodes_evaluated += self.solver.nodes
+        outcome, plies_left = self.solver.outcome(score, position.piece_count())
+        if outcome == 'win':  # Put the solver's score on the search's WIN_SCORE scale
+            result = WIN_SCORE - plies_left, move
+        elif outcome == 'loss':
+            result = plies_left - WIN_SCORE, move
+        else:
+            result = 0, move
+        solver_stats = {'nodes': self.solver.nodes, 'time': time.time() - solve_start, 'score': score,
+                        'outcome': outcome, 'plies_left': plies_left}
+        return result, solver_stats
+
+    def select_move(self, board, col_num, row_num):
+        """Select the best move using the minimax algorithm."""
+        difficulty_probabilities = {'Easy':0.4,'Medium':0.8,'Hard': 1} #Probabilites of Choosing Optimal Move
+        probability = random.uniform(0,1)
+        if self.mcts is None and probability > difficulty_probabilities[self.difficulty]:  # Monte Carlo tree search scales its budget instead
+            return random.choice(Position.from_board(board, self.win_length).valid_moves()),[],[],[],[],[],[]
+        else:
+          start_time = time.time()  # Record the start time
+          deadline = time.perf_counter() + self.time_limit_ms / 1000 if self.time_limit_ms is not None else None  # End of the time budget
+          position = Position.from_board(board, self.win_length)  # Convert the board to bitboards once per move
+          self.evaluator.attach(position)  # Keep the evaluation up to date during the search
+          move_stats = SearchStats() if self.instrument or self.profile else None
+          if self.instrument:  # Count nodes and time the search phases
+              move_stats.instrument(self, position)
+              self.stats = move_stats
+          profiler = start_profiler(self.profile) if self.profile else None
+          self.killer_moves = []  # Killer moves are only meaningful within one search
+          for history in self.history:  # Age the history so recent cutoffs count the most
+              for index in range(len(history)):
+                  history[index] //= 2
+          tactic = self.tactical_move(position) if self.tactics else None  # Forced moves need no search
+          book_entry = self.book.lookup(position) if self.book is not None and tactic is None else None  # Look the position up in the opening book
+          empty_cells = self.row_count * self.col_count - position.piece_count()
+          solved = None
+          if tactic is None and book_entry is None and self.solver is not None and empty_cells <= self.endgame_threshold:
+              solved = self.solve_endgame(position)  # Few enough cells left to solve exactly; None if it ran out of time
+          solver_stats = None
+          win_rate = None
+          if tactic is not None:
+              move, reason = tactic
+              score = WIN_SCORE - 1 if reason == 'win' else None  # Forced moves other than wins are not scored
+              result = score, move
+              self.depths_reached.append(2 if reason == 'only_safe' else 1)  # Plies looked ahead
+          elif book_entry is not None:
+              result = book_entry[1], book_entry[0]  # Play the book move without searching
+              self.depths_reached.append(self.book.depth)
+          elif solved is not None:
+              result, solver_stats = solved
+              self.depths_reached.append(empty_cells)  # Searched to the end of the game
+          elif self.mcts is not None:
+              (win_rate, move), depth_reached = self.mcts_search(position)
+              result = None, move  # A win rate is not on the score scale of the other searches
+              self.depths_reached.append(depth_reached)
+          elif self.time_limit_ms is None:
+              self.deadline = float('inf') if self.stop_flag is not None else None  # Only the stop flag can end a fixed-depth search
+              result = self.search_root(position, self.depth, col_num, row_num)  # Call minimax to select the best move
+              self.deadline = None
+              self.depths_reached.append(self.depth)
+          else:
+              result, depth_reached = self.iterative_deepening(position, col_num, row_num, deadline)  # Deepen until the time budget runs out
+              self.depths_reached.append(depth_reached)
+          self.endgame_stats.append(solver_stats)
+          self.tactical_moves.append(tactic[1] if tactic is not None else None)
+          self.scores.append(result[0])
+          self.win_rates.append(win_rate)
+          end_time = time.time()  # Record the end time
+          execution_time = end_time - start_time  # Calculate the execution time
+          self.execution_times.append(execution_time)
+          if profiler is not None:
+              move_stats.profile = stop_profiler(profiler)
+          if move_stats is not None:
+              move_stats.search_time = execution_time
+          self.stats = None
+          self.search_stats.append(move_stats)
+
+        # Print metrics
+        self.nodes_count.append(self.total_nodes_evaluated)
+        self.total_nodes_evaluated = 0
+        if self.transposition_table is not None:
+            self.tt_stats.append(self.transposition_table.get_stats())
+            self.transposition_table.reset_stats()
+        else:
+            self.tt_stats.append(None)
+
+        return result[1],[self.nodes_count[-1]],[execution_time],[self.tt_stats[-1]],[self.depths_reached[-1]],[self.endgame_stats[-1]],[self.search_stats[-1]] # Return the selected move
+
@@ -0,0 +1,110 @@
+import threading
+import time
+from multiprocessing.sharedctypes import RawValue
+from bitboard import Position
+from ai import SearchTimeout
+
+
+class BackgroundSearch:
+    """Class running one AI player's searches on a background thread.
+
+    The caller starts a search and polls for its result, so a UI event loop
+    keeps running while the AI thinks. After the AI moves, ``ponder`` searches
+    the position the AI expects after the opponent's reply. If the opponent
+    plays that reply, the pondered search becomes the real one and its result
+    is often ready at once. Otherwise the pondered search is stopped.
+
+    The search runs on a thread rather than a process so the player's
+    transposition table, history and stats stay in one place across moves.
+    A pondered search that is thrown away leaves no trace in the per-move
+    stats, since its move was never played.
+    """
+
+    STAT_LISTS = ('nodes_count', 'execution_times', 'scores', 'win_rates', 'depths_reached', 'tactical_moves',
+                  'tt_stats', 'endgame_stats', 'search_stats')  # Per-move lists select_move appends to
+
+    def __init__(self, player):
+        """Prepare background searches for the AI player."""
+        self.player = player
+        self.player.stop_flag = RawValue('b', 0)  # Set to stop the running search
+        self.thread = None  # Thread running the current search
+        self.output = None  # select_move output of the finished search
+        self.board = None  # Board being searched
+        self.pondering = False  # Whether the running search is a ponder search
+        self.stat_lengths = {}  # Lengths of the player's per-move stat lists before the ponder search
+        self.start_time = None  # Time the current search was requested for real
+        self.ponder_hits = 0  # Number of opponent replies the AI predicted
+        self.ponder_misses = 0  # Number of pondered searches thrown away
+        self.latencies = []  # Seconds from each start call to its result
+
+    def run(self, board, col_num, row_num):
+        """Search the board; this runs on the background thread."""
+        try:
+            self.output = self.player.select_move(board, col_num, row_num)
+        except SearchTimeout:  # Stopped by cancel
+            self.output = None
+
+    def launch(self, board, col_num, row_num, pondering):
+        """Start a search of the board on a new thread."""
+        self.board = [row[:] for row in board]  # The UI keeps changing its own board
+        self.output = None
+        self.pondering = pondering
+        if pondering:  # Remember where the ponder search's stats will start, in case they must be thrown away
+            self.stat_lengths = {name: len(getattr(self.player, name)) for name in self.STAT_LISTS}
+        self.thread = threading.Thread(target=self.run, args=(self.board, col_num, row_num), daemon=True)
+        self.thread.start()
+
+    def cancel(self):
+        """Stop the running search, if any, and throw its result away."""
+        if self.thread is not None:
+            self.player.stop_flag.value = 1
+            self.thread.join()
+            self.player.stop_flag.value = 0
+            self.player.total_nodes_evaluated = 0  # Do not count the stopped search's nodes against the next move
+            self.player.stats = None
+            if self.player.transposition_table is not None:
+                self.player.transposition_table.reset_stats()
+            if self.pondering:  # The predicted move was not played, so drop any stats its search recorded
+                for name, length in self.stat_lengths.items():
+                    del getattr(self.player, name)[length:]
+        self.thread, self.output, self.board, self.pondering = None, None, None, False
+
+    def start(self, board, col_num, row_num):
+        """Start searching for the AI's move on the board, reusing the ponder search if it predicted the board."""
+        self.start_time = time.perf_counter()
+        if self.pondering:
+            if board == self.board:  # The opponent played the predicted reply
+                self.ponder_hits += 1
+                self.pondering = False
+                return
+            self.ponder_misses += 1
+        self.cancel()
+        self.launch(board, col_num, row_num, False)
+
+    def busy(self):
+        """Check if a search for the AI's move was started and has not been collected yet."""
+        return self.start_time is not None
+
+    def poll(self):
+        """Return the select_move output of the started search once it has finished, otherwise None."""
+        if self.start_time is None or self.thread is None or self.thread.is_alive():
+            return None
+        output = self.output
+        self.latencies.append(time.perf_counter() - self.start_time)
+        self.thread, self.output, self.board, self.start_time = None, None, None, None
+        return output
+
+    def ponder(self, board):
+        """Search the position expected after the opponent's reply to the board, while the opponent thinks."""
+        self.cancel()
+        reply = self.player.predict_reply(board)
+        if reply is None:
+            return
+        position = Position.from_board(board, self.player.win_length)
+        row_num = position.make_move(reply, self.player.opponent_piece)
+        self.launch(position.to_board(), reply, row_num, True)
+
+    def close(self):
+        """Stop the running search."""
+        self.cancel()
+        self.start_time = None
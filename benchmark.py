@@ -1,10 +1,14 @@
-from connect4 import Connect4  # Import the Connect4 class from the connect4.py
-import os  # Import the os module for system-related functionalities
+from game import play_game  # Import the headless game loop from the game.py
+from ai import AIPlayer  # Import the AIPlayer class from the ai.py
+from bitboard import Position  # Import the bitboard position used by the AI search
+import time  # Import the time module for timing searches
+from tournament import make_config, run_tournament, print_summary  # Import the multi-process tournament runner
 
 def play_multiplayer():
     """
     Start a multiplayer Connect4 game.
     """
+    from connect4 import Connect4  # pygame is only needed for the interactive games
     game = Connect4(multiplayer=True)  # Create a Connect4 object for multiplayer game
     game.start_game()  # Start the game
 
@@ -16,62 +20,270 @@ def play_with_ai(difficulty, pruning=True):
         difficulty (str): The difficulty level of the AI player ('Easy', 'Medium', or 'Hard').
         pruning (bool): A flag indicating whether alpha-beta pruning should be enabled (default is True).
     """
+    from connect4 import Connect4  # pygame is only needed for the interactive games
     game = Connect4(aiplayer2_difficulty=difficulty, pruning=pruning)  # Create a Connect4 object for AI game
     game.start_game()  # Start the game
 
-def simulate_ai_game(aiplayer1_difficulty, aiplayer2_difficulty, depth=5, pruning=True):
+def simulate_ai_game(aiplayer1_difficulty, aiplayer2_difficulty, depth=5, pruning=True, seed=None):
     """
-    Simulate a Connect4 game between two AI players.
+    Simulate a Connect4 game between two AI players without opening a window.
     
     Parameters:
         aiplayer1_difficulty (str): The difficulty level of AI player 1 ('Easy', 'Medium', or 'Hard').
         aiplayer2_difficulty (str): The difficulty level of AI player 2 ('Easy', 'Medium', or 'Hard').
         depth (int): The depth of the minimax algorithm (default is 5).
         pruning (bool): A flag indicating whether alpha-beta pruning should be enabled (default is True).
+        seed (int): The seed of the AI players' random choices (default is None).
     
     Returns:
         tuple: A tuple containing the statistics of the game.
     """
-    game = Connect4(aiplayer1_difficulty=aiplayer1_difficulty, aiplayer2_difficulty=aiplayer2_difficulty, 
-                    depth=depth, pruning=pruning, simulate=True)  # Create a Connect4 object for simulation
-    game.start_game()  # Start the game
+    aiplayer1 = AIPlayer(6, 7, 1, aiplayer1_difficulty, pruning, depth)  # Initialize AI player 1
+    aiplayer2 = AIPlayer(6, 7, 2, aiplayer2_difficulty, pruning, depth)  # Initialize AI player 2
+    game = play_game(aiplayer1, aiplayer2, seed)  # Play the game at full speed
     return game.get_stats()  # Return the game statistics
 
-def benchmark(aiplayer1_difficulty, aiplayer2_difficulty, depth):
+def average_rate(tt_stats, rate):
+    """
+    Average one transposition table rate over the moves that used the table.
+    
+    Parameters:
+        tt_stats (list): The per-move transposition table stats of an AI player.
+        rate (str): The rate to average ('hit_rate', 'miss_rate' or 'overwrite_rate').
+    
+    Returns:
+        float: The average rate as a percentage.
+    """
+    rates = [stats[rate] for stats in tt_stats if stats is not None]
+    return round(100 * sum(rates) / len(rates), 2) if rates else 0.0
+
+def benchmark(aiplayer1_difficulty, aiplayer2_difficulty, depth, games=20, workers=None, seed=0):
     """
-    Benchmark the performance of AI players in a simulated Connect4 game.
+    Benchmark the performance of AI players over many seeded games played on all cores.
     
     Parameters:
         aiplayer1_difficulty (str): The difficulty level of AI player 1 ('Easy', 'Medium', or 'Hard').
         aiplayer2_difficulty (str): The difficulty level of AI player 2 ('Easy', 'Medium', or 'Hard').
         depth (int): The depth of the minimax algorithm.
+        games (int): The number of games played with and without pruning (default is 20).
+        workers (int): The number of worker processes (default is one per core).
+        seed (int): The seed of the games (default is 0).
+    """
+    for pruning, title in ((False, "Stats Without Pruning"), (True, "Stats With Pruning")):
+        configs = [make_config('Player 1', aiplayer1_difficulty, depth, pruning),
+                   make_config('Player 2', aiplayer2_difficulty, depth, pruning)]
+        summary = run_tournament(configs, games, seed, workers, verbose=False)  # Players alternate who moves first
+        print(title)
+        # Print statistics
+        for name in ('Player 1', 'Player 2'):
+            moves = sum(result['searched_moves'][name] for result in summary['games']) or 1
+            nodes = sum(result['nodes'][name] for result in summary['games'])
+            seconds = sum(result['time'][name] for result in summary['games'])
+            tt_stats = [stats for result in summary['games'] for stats in result['tt_stats'][name]]
+            print(f"{name}'s Average Evaluated Nodes Per Move: {round(nodes / moves, 2)} nodes")
+            print(f"{name}'s Average Evaluation Time Per Move: {round(seconds / moves, 4)} seconds")
+            print(f"{name}'s Transposition Table Hit/Miss/Overwrite Rates: {average_rate(tt_stats, 'hit_rate')}% / {average_rate(tt_stats, 'miss_rate')}% / {average_rate(tt_stats, 'overwrite_rate')}%")
+        print_summary(summary)
+        print('----------------------------------------------')
+
+def opening_position(opening=()):
+    """
+    Play opening moves from the empty board.
+    
+    Parameters:
+        opening (tuple): The columns played, starting with player 1.
+    
+    Returns:
+        tuple: The position, the last column played and the row it landed in, and the piece to move.
+    """
+    position = Position()
+    col_num, row_num = None, None  # Last move of the opening
+    for ply, col in enumerate(opening):  # Play the opening moves
+        col_num, row_num = col, position.make_move(col, ply % 2 + 1)
+    return position, col_num, row_num, len(opening) % 2 + 1
+
+def compare_search(depth=7, opening=(), tt_memory_mb=16):
+    """
+    Compare plain alpha-beta minimax with principal variation search on one position.
+    
+    Parameters:
+        depth (int): The depth of both searches (default is 7).
+        opening (tuple): The columns played from the empty board before the AI moves (default is the empty board).
+        tt_memory_mb (int): The transposition table size of both AI players, 0 to disable it (default is 16).
+    
+    Returns:
+        dict: The chosen move, evaluated nodes and search time of each algorithm.
+    """
+    position, col_num, row_num, ai_piece = opening_position(opening)  # The AI plays the side to move
+    results = {}
+    for search in ('minimax', 'pvs'):
+        player = AIPlayer(position.row_count, position.col_count, ai_piece, 'Hard', True, depth, tt_memory_mb, search=search)
+        move, nodes, times = player.select_move(position.to_board(), col_num, row_num)[:3]
+        results[search] = {'move': move, 'nodes': nodes[0], 'time': times[0]}
+        print(f"{search:>7}: move {move}, {nodes[0]} nodes, {round(times[0], 3)} seconds")
+    print(f"PVS evaluates {round(results['minimax']['nodes'] / results['pvs']['nodes'], 2)}x fewer nodes than alpha-beta at depth {depth}")
+    return results
+
+def parallel_speedup(depths=range(6, 11), worker_counts=(1, 2, 4, 8), parallel='root', search='pvs', opening=(3, 3)):
+    """
+    Measure how much faster one move is searched as workers are added.
+    
+    Parameters:
+        depths (iterable): The search depths to measure (default is 6 to 10).
+        worker_counts (tuple): The numbers of worker processes to compare; the first one is the baseline (default is 1, 2, 4 and 8).
+        parallel (str): The parallel search mode, 'root' or 'lazy' (default is 'root').
+        search (str): The search algorithm, 'minimax' or 'pvs' (default is 'pvs').
+        opening (tuple): The columns played from the empty board before the AI moves (default is (3, 3)).
+    
+    Returns:
+        dict: The search time of every (depth, workers) pair.
     """
-    os.system('cls')  # Clear the console screen
-    # Simulate a game without pruning
-    output_without_pruning = simulate_ai_game(aiplayer1_difficulty=aiplayer1_difficulty, 
-                                               aiplayer2_difficulty=aiplayer2_difficulty, 
-                                               pruning=False, depth=depth)
-    print("Stats Without Pruning")
-    # Print statistics
-    print(f"Player 1's Average Evaluated Nodes Per Move: {round(sum(output_without_pruning[0])/len(output_without_pruning[0]),2)} nodes")
-    print(f"Player 1's Average Evaluation Time Per Move: {round(sum(output_without_pruning[1])/len(output_without_pruning[1]),2)} seconds")
-    print(f"Player 2's Average Evaluated Nodes Per Move: {round(sum(output_without_pruning[2])/len(output_without_pruning[2]),2)} nodes")
-    print(f"Player 2's Average Evaluation Time Per Move: {round(sum(output_without_pruning[3])/len(output_without_pruning[3]),2)} seconds")
-    print(f"Player {output_without_pruning[4]} wins the game !")
-    print('----------------------------------------------')
-   
-    # Simulate a game with pruning
-    output_with_pruning = simulate_ai_game(aiplayer1_difficulty=aiplayer1_difficulty, 
-                                           aiplayer2_difficulty=aiplayer2_difficulty, 
-                                           pruning=True, depth=depth)
-    print("Stats With Pruning")
-    # Print statistics
-    print(f"Player 1's Average Evaluated Nodes Per Move: {round(sum(output_with_pruning[0])/len(output_with_pruning[0]),2)} nodes")
-    print(f"Player 1's Average Evaluation Time Per Move: {round(sum(output_with_pruning[1])/len(output_with_pruning[1]),2)} seconds")
-    print(f"Player 2's Average Evaluated Nodes Per Move: {round(sum(output_with_pruning[2])/len(output_with_pruning[2]),2)} nodes")
-    print(f"Player 2's Average Evaluation Time Per Move: {round(sum(output_with_pruning[3])/len(output_with_pruning[3]),2)} seconds")
-    print(f"Player {output_with_pruning[4]} wins the game !")
-
-# Benchmark the performance of AI players
-benchmark("Hard", "Medium", 3)
-# You can experiment with different AI players and depth values to see how the performance changes. Also, you can use play_multiplayer() and play_with_ai() to play a game with a human player or an AI, respectively.
+    position, col_num, row_num, ai_piece = opening_position(opening)
+    board = position.to_board()
+    times = {}
+    for depth in depths:
+        for workers in worker_counts:
+            player = AIPlayer(position.row_count, position.col_count, ai_piece, 'Hard', True, depth, search=search,
+                              workers=workers, parallel=parallel)  # Fresh player, so no results are reused between runs
+            start_time = time.perf_counter()
+            player.select_move(board, col_num, row_num)
+            times[(depth, workers)] = time.perf_counter() - start_time
+            player.close()
+            speedup = times[(depth, worker_counts[0])] / times[(depth, workers)]
+            print(f"Depth {depth}, {workers} workers: {round(times[(depth, workers)], 3)} seconds, {round(speedup, 2)}x speedup")
+    return times
+
+def mcts_vs_minimax(time_limit_ms=200, games=10, workers=None, seed=0):
+    """
+    Play Monte Carlo tree search against iterative-deepening PVS with the same time budget per move.
+    
+    Parameters:
+        time_limit_ms (int): The time budget of every move of both players (default is 200).
+        games (int): The number of games played (default is 10).
+        workers (int): The number of worker processes (default is one per core).
+        seed (int): The seed of the games (default is 0).
+    
+    Returns:
+        dict: The tournament summary.
+    """
+    configs = [make_config('MCTS', search='mcts', time_limit_ms=time_limit_ms),
+               make_config('PVS', search='pvs', time_limit_ms=time_limit_ms)]
+    return run_tournament(configs, games, seed, workers)
+
+def tactical_shortcut(depth=7, games=4, search='pvs', seed=0):
+    """
+    Measure how often the tactical pre-search decides the move and how much search time it saves.
+
+    Parameters:
+        depth (int): The search depth of both AI players (default is 7).
+        games (int): The number of seeded self-play games (default is 4).
+        search (str): The search algorithm, 'minimax' or 'pvs' (default is 'pvs').
+        seed (int): The seed of the first game (default is 0).
+
+    Returns:
+        dict: The number of moves, the shortcuts taken by reason, and the time spent on the shortcut moves
+        compared with a full search of the same positions by a fresh player without tactics.
+    """
+    results = {'moves': 0, 'shortcuts': {'win': 0, 'block': 0, 'only_safe': 0}, 'search_time': 0.0,
+               'shortcut_time': 0.0, 'full_search_time': 0.0, 'full_search_nodes': 0, 'same_move': 0}
+    for game_number in range(games):
+        players = (AIPlayer(6, 7, 1, 'Hard', True, depth, search=search), AIPlayer(6, 7, 2, 'Hard', True, depth, search=search))
+        game = play_game(players[0], players[1], seed + game_number)
+        position = Position()
+        col_num, row_num = None, None
+        for ply, col in enumerate(game.moves):  # Replay the game to find the positions the shortcut decided
+            player = players[ply % 2]
+            reason = player.tactical_moves[ply // 2]
+            results['moves'] += 1
+            results['search_time'] += player.execution_times[ply // 2]
+            if reason is not None:
+                results['shortcuts'][reason] += 1
+                results['shortcut_time'] += player.execution_times[ply // 2]
+                full_player = AIPlayer(6, 7, player.ai_piece, 'Hard', True, depth, search=search, tactics=False)
+                output = full_player.select_move(position.to_board(), col_num, row_num)
+                results['full_search_time'] += output[2][0]
+                results['full_search_nodes'] += output[1][0]
+                results['same_move'] += output[0] == col
+            col_num, row_num = col, position.make_move(col, ply % 2 + 1)
+    fired = sum(results['shortcuts'].values())
+    saved = results['full_search_time'] - results['shortcut_time']
+    print(f"Tactical shortcut fired on {fired} of {results['moves']} moves ({round(100 * fired / results['moves'], 1)}%): {results['shortcuts']}")
+    print(f"Shortcut moves took {round(1000 * results['shortcut_time'], 2)} ms instead of {round(1000 * results['full_search_time'], 2)} ms "
+          f"and {results['full_search_nodes']} nodes of full search; the search agreed on {results['same_move']} of {fired} moves")
+    print(f"Saved {round(saved, 3)} of {round(results['search_time'] + saved, 3)} seconds of search ({round(100 * saved / (results['search_time'] + saved), 1)}%)")
+    return results
+
+def board_scaling(boards=((6, 7, 4), (7, 8, 4), (8, 9, 5), (9, 10, 5)), depth=8, search='pvs', opening_moves=4):
+    """
+    Measure how search speed and memory change as the board and the winning line grow.
+
+    Parameters:
+        boards (tuple): The (row count, column count, win length) of every board measured
+        (default is 6x7 connect 4 up to 9x10 connect 5).
+        depth (int): The search depth on every board (default is 8).
+        search (str): The search algorithm, 'minimax' or 'pvs' (default is 'pvs').
+        opening_moves (int): The number of moves played around the center column before the AI moves (default is 4).
+
+    Returns:
+        dict: The windows, evaluated nodes, search time, nodes per second and peak memory allocated by the search on every board.
+    """
+    import tracemalloc  # Only this benchmark traces allocations
+    from bitboard import window_cells
+    results = {}
+    for row_count, col_count, win_length in boards:
+        center = col_count // 2
+        opening = [center + (ply // 2 % 2) * (1 if ply % 4 < 2 else -1) for ply in range(opening_moves)]
+        position = Position(row_count, col_count, win_length)
+        col_num, row_num = None, None
+        for ply, col in enumerate(opening):
+            col_num, row_num = col, position.make_move(col, ply % 2 + 1)
+        board = position.to_board()
+        players = [AIPlayer(row_count, col_count, opening_moves % 2 + 1, 'Hard', True, depth, search=search, tactics=False,
+                            endgame_threshold=0, win_length=win_length) for _ in range(2)]  # Fresh players, so no results are reused
+        start_time = time.perf_counter()
+        output = players[0].select_move(board, col_num, row_num)
+        elapsed = time.perf_counter() - start_time
+        tracemalloc.start()  # Tracing slows the search down, so memory is measured on a second search
+        players[1].select_move(board, col_num, row_num)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        windows = len(window_cells(row_count, col_count, win_length))
+        results[(row_count, col_count, win_length)] = {'windows': windows, 'nodes': output[1][0], 'time': elapsed,
+                                                       'nodes_per_second': output[1][0] / elapsed, 'peak_memory': peak}
+        print(f"{row_count}x{col_count} connect {win_length}: {windows} windows, "
+              f"{output[1][0]} nodes in {round(elapsed, 3)} seconds ({round(output[1][0] / elapsed)} nodes/second), "
+              f"{round(peak / 1024)} KiB peak memory")
+    return results
+
+def compare_redraw(moves=(3, 3, 2, 4, 2, 2, 1, 0, 3, 3, 1, 3), hovers_per_move=20):
+    """
+    Compare the redraw cost of the dirty-rectangle renderer with the full-redraw path.
+    
+    Parameters:
+        moves (tuple): The columns played, each preceded by mouse motions over the board.
+        hovers_per_move (int): The number of hover redraws before each move (default is 20).
+    
+    Returns:
+        dict: The mean and maximum redraw time in milliseconds of each path.
+    """
+    from connect4 import Connect4  # pygame is only needed for the interactive games
+    results = {}
+    for dirty_rendering, name in ((False, 'full'), (True, 'dirty')):
+        game = Connect4(multiplayer=True, dirty_rendering=dirty_rendering)
+        game.draw_board()
+        for col in moves:
+            for hover in range(hovers_per_move):
+                game.select_piece((col + hover // 4) % game.col_count)  # A few motions stay over the same column
+            game.play_move(col)
+            game.draw_board()
+        times = game.redraw_times[1:]  # Skip the first full draw
+        results[name] = {'mean_ms': 1000 * sum(times) / len(times), 'max_ms': 1000 * max(times)}
+        print(f"{name:>5} redraw: {round(results[name]['mean_ms'], 3)} ms mean, {round(results[name]['max_ms'], 3)} ms max")
+    return results
+
+if __name__ == "__main__":  # Worker processes import this module, so only benchmark when run directly
+    # Benchmark the performance of AI players
+    benchmark("Hard", "Medium", 3)
+    # Compare alpha-beta with principal variation search on the opening position
+    compare_search(7)
+    # You can experiment with different AI players and depth values to see how the performance changes. Also, you can use play_multiplayer() and play_with_ai() to play a game with a human player or an AI, respectively.
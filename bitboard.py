@@ -0,0 +1,185 @@
+import random
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def zobrist_keys(row_count, col_count):
+    """Return the 64-bit Zobrist keys of every (piece, bit index) pair."""
+    rng = random.Random(row_count * 1000 + col_count)  # Fixed seed so every process agrees on the keys
+    size = col_count * (row_count + 1)  # Number of bits on the board, including sentinels
+    return tuple(tuple(rng.getrandbits(64) for _ in range(size)) for _ in range(2))
+
+
+@lru_cache(maxsize=None)
+def window_cells(row_count, col_count, win_length=4):
+    """Return the bit indices of the win_length cells of every window on the board."""
+    stride = row_count + 1  # Bits per column, including the sentinel bit
+    reach = win_length - 1  # Distance from the first to the last cell of a window
+    windows = []
+    for shift, col_span, row_start, row_end in ((1, 1, 0, row_count - reach),  # Vertical windows
+                                                 (stride, win_length, 0, row_count),  # Horizontal windows
+                                                 (stride + 1, win_length, 0, row_count - reach),  # Positive diagonal windows
+                                                 (stride - 1, win_length, reach, row_count)):  # Negative diagonal windows
+        for col in range(col_count - col_span + 1):
+            for row in range(row_start, row_end):
+                start = col * stride + row  # Bit index of the first cell of the window
+                windows.append(tuple(start + shift * i for i in range(win_length)))
+    return tuple(windows)
+
+
+@lru_cache(maxsize=None)
+def window_masks(row_count, col_count, win_length=4):
+    """Return the bitmasks of every win_length-cell window on the board."""
+    return tuple(sum(1 << index for index in cells) for cells in window_cells(row_count, col_count, win_length))
+
+
+@lru_cache(maxsize=None)
+def cell_windows(row_count, col_count, win_length=4):
+    """Return, for every bit index, the ids of the windows that contain that cell."""
+    windows = [[] for _ in range(col_count * (row_count + 1))]
+    for window, cells in enumerate(window_cells(row_count, col_count, win_length)):
+        for index in cells:
+            windows[index].append(window)
+    return tuple(tuple(ids) for ids in windows)
+
+
+@lru_cache(maxsize=None)
+def run_shifts(row_count, win_length=4):
+    """
+    Return, for each line direction, the shifts that reduce a bitboard to the starts of its winning runs.
+
+    A bitboard ANDed with itself shifted by ``k`` cells keeps the cells that start a run
+    of ``k + 1``. Doubling the run length each time, and finishing with a shorter shift,
+    finds runs of win_length in about log2(win_length) steps.
+    """
+    stride = row_count + 1  # Bits per column, including the sentinel bit
+    steps = []
+    length = 1  # Length of the runs found so far
+    while length < win_length:
+        step = min(length, win_length - length)
+        steps.append(step)
+        length += step
+    return tuple(tuple(step * shift for step in steps) for shift in (1, stride, stride - 1, stride + 1))
+
+
+class Position:
+    """Class representing a Connect 4 position as a pair of bitboards.
+
+    Bit ``col * (row_count + 1) + row`` holds the cell ``row`` places above the
+    bottom of column ``col``. The extra bit on top of every column is always
+    empty, so shifted bitboards never wrap from one column into the next.
+    Bitboards are Python integers, so boards of any size fit, and a line of
+    ``win_length`` pieces wins.
+    """
+
+    def __init__(self, row_count=6, col_count=7, win_length=4):
+        """Initialize an empty position."""
+        self.row_count = row_count  # Number of rows in the game board
+        self.col_count = col_count  # Number of columns in the game board
+        self.win_length = win_length  # Number of pieces in a row that wins
+        self.stride = row_count + 1  # Bits per column, including the sentinel bit
+        self.bitboards = [0, 0]  # Bitboards of player 1 and player 2 pieces
+        self.heights = [col * self.stride for col in range(col_count)]  # Next free bit index in each column
+        self.tops = [col * self.stride + row_count for col in range(col_count)]  # Sentinel bit index of each column
+        self.shifts = run_shifts(row_count, win_length)  # Run-finding shifts of the vertical, horizontal and both diagonal lines
+        self.moves = []  # Stack of (column, piece) pairs used by unmake_move
+        self.zobrist = zobrist_keys(row_count, col_count)  # Zobrist keys of each piece on each bit
+        self.key = 0  # Zobrist hash of the position, updated incrementally
+        self.evaluator = None  # Optional incremental evaluator notified of every move
+
+    @classmethod
+    def from_board(cls, board, win_length=4):
+        """Build a position from a list-of-lists board (row 0 at the top)."""
+        position = cls(len(board), len(board[0]), win_length)
+        for row in range(position.row_count - 1, -1, -1):  # Fill every column from the bottom up
+            for col in range(position.col_count):
+                piece = board[row][col]
+                if piece != 0:
+                    position.bitboards[piece - 1] |= 1 << position.heights[col]
+                    position.key ^= position.zobrist[piece - 1][position.heights[col]]
+                    position.heights[col] += 1
+        return position
+
+    def to_board(self):
+        """Return the position as a list-of-lists board (row 0 at the top)."""
+        return [[self.piece_at(row, col) for col in range(self.col_count)] for row in range(self.row_count)]
+
+    def __str__(self):
+        """Return a string representation of the board."""
+        output = ""
+        for row in self.to_board():
+            output += '\n' + str(row)
+        return output
+
+    def bit(self, row, col):
+        """Return the bit of the cell at the given board row and column."""
+        return 1 << (col * self.stride + self.row_count - 1 - row)
+
+    def piece_at(self, row, col):
+        """Return the piece at the given board row and column (0 if empty)."""
+        bit = self.bit(row, col)
+        if self.bitboards[0] & bit:
+            return 1
+        if self.bitboards[1] & bit:
+            return 2
+        return 0
+
+    def can_play(self, col):
+        """Check if the column still has room for a piece."""
+        return self.heights[col] < self.tops[col]
+
+    def valid_moves(self):
+        """Return a list of the columns that are not full."""
+        return [col for col in range(self.col_count) if self.heights[col] < self.tops[col]]
+
+    def piece_count(self):
+        """Return the number of pieces on the board."""
+        return sum(self.heights[col] - col * self.stride for col in range(self.col_count))
+
+    def is_full(self):
+        """Check if every column is full."""
+        return self.heights == self.tops
+
+    def make_move(self, col, piece):
+        """Drop a piece into the column and return the board row it landed in."""
+        index = self.heights[col]
+        self.bitboards[piece - 1] |= 1 << index
+        self.key ^= self.zobrist[piece - 1][index]
+        self.heights[col] = index + 1
+        self.moves.append((col, piece))
+        if self.evaluator is not None:
+            self.evaluator.place(index, piece)
+        return self.stride * (col + 1) - 2 - index  # Convert the bit index back to a board row
+
+    def unmake_move(self):
+        """Take back the last move made with make_move."""
+        col, piece = self.moves.pop()
+        index = self.heights[col] - 1
+        self.heights[col] = index
+        self.bitboards[piece - 1] ^= 1 << index
+        self.key ^= self.zobrist[piece - 1][index]
+        if self.evaluator is not None:
+            self.evaluator.remove(index, piece)
+        return col, piece
+
+    def is_winning_move(self, col, piece):
+        """Check if dropping the piece into the column would make a winning line."""
+        bitboard = self.bitboards[piece - 1] | (1 << self.heights[col])
+        for shifts in self.shifts:
+            runs = bitboard
+            for shift in shifts:
+                runs &= runs >> shift
+            if runs:
+                return True
+        return False
+
+    def has_won(self, piece):
+        """Check if the piece has a line of win_length in a row anywhere on the board."""
+        bitboard = self.bitboards[piece - 1]
+        for shifts in self.shifts:
+            runs = bitboard
+            for shift in shifts:  # Cells that start a run of two, then four, ... up to win_length
+                runs &= runs >> shift
+            if runs:
+                return True
+        return False
@@ -0,0 +1,163 @@
+import mmap
+import struct
+import sys
+from multiprocessing import Pool
+from bitboard import Position
+
+HEADER = struct.Struct('<4sBBBBBI')  # Magic, version, row count, column count, win length, search depth, entry count
+ENTRY = struct.Struct('<Qbi')  # Position key, best move, score (from the side to move's point of view)
+MAGIC = b'C4BK'
+VERSION = 2
+SCORE_LIMIT = 2 ** 31 - 1  # Stored value of an infinite score
+
+
+def position_key(position):
+    """Return a unique integer key of the position: player 1's pieces plus each column's height marker."""
+    bottom = sum(1 << (col * position.stride) for col in range(position.col_count))  # Lowest bit of every column
+    mask = position.bitboards[0] | position.bitboards[1]
+    return position.bitboards[0] + mask + bottom  # Adding the bottom bits turns each column's pieces into a single height bit
+
+
+def mirror_key(key, row_count, col_count):
+    """Return the key of the position mirrored left to right."""
+    stride = row_count + 1
+    column_mask = (1 << stride) - 1
+    mirrored = 0
+    for col in range(col_count):
+        mirrored |= ((key >> (col * stride)) & column_mask) << ((col_count - 1 - col) * stride)
+    return mirrored
+
+
+def canonical_key(position):
+    """Return the smaller of the position's key and its mirror's key, and whether the mirror was taken."""
+    key = position_key(position)
+    mirrored = mirror_key(key, position.row_count, position.col_count)
+    return (mirrored, True) if mirrored < key else (key, False)
+
+
+class OpeningBook:
+    """Class representing an opening book file, read through mmap.
+
+    The file is a header followed by fixed-size entries sorted by canonical
+    position key, so lookups are a binary search over the mapped pages and
+    processes sharing the book share the operating system's page cache.
+    """
+
+    def __init__(self, path):
+        """Map the book file into memory."""
+        self.file = open(path, 'rb')
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.row_count, self.col_count, self.win_length, self.depth, self.entry_count = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} opening book")
+
+    def lookup(self, position):
+        """Return the book's (best move, score) for the position, or None if it is not in the book."""
+        if (position.row_count, position.col_count, position.win_length) != (self.row_count, self.col_count, self.win_length):
+            return None
+        key, mirrored = canonical_key(position)
+        low, high = 0, self.entry_count - 1
+        while low <= high:  # Binary search over the sorted entries
+            middle = (low + high) // 2
+            entry_key, move, score = ENTRY.unpack_from(self.data, HEADER.size + middle * ENTRY.size)
+            if entry_key < key:
+                low = middle + 1
+            elif entry_key > key:
+                high = middle - 1
+            else:
+                if score == SCORE_LIMIT:
+                    score = float('inf')
+                elif score == -SCORE_LIMIT:
+                    score = float('-inf')
+                return (self.col_count - 1 - move if mirrored else move), score
+        return None
+
+    def close(self):
+        """Unmap the book file."""
+        self.data.close()
+        self.file.close()
+
+
+def book_positions(plies, row_count=6, col_count=7, win_length=4):
+    """Return the board and piece to move of every distinct non-terminal position with fewer than plies pieces, folding mirror images."""
+    position = Position(row_count, col_count, win_length)
+    seen = set()
+    positions = []
+
+    def visit(piece):
+        key, _ = canonical_key(position)
+        if key in seen:
+            return
+        seen.add(key)
+        positions.append((position.to_board(), piece))
+        if len(position.moves) + 1 >= plies:  # Children would be past the end of the book
+            return
+        for col in position.valid_moves():
+            position.make_move(col, piece)
+            if not position.has_won(piece) and not position.is_full():
+                visit(3 - piece)
+            position.unmake_move()
+
+    visit(1)
+    return positions
+
+
+_book_players = {}  # AI players of the current build worker, one per piece
+
+
+def search_book_position(task):
+    """Search one book position deeply; this runs inside a build worker process."""
+    board, piece, depth, search, win_length = task
+    from ai import AIPlayer  # ai.py imports this module
+    if piece not in _book_players:
+        _book_players[piece] = AIPlayer(len(board), len(board[0]), piece, 'Hard', True, depth, search=search, win_length=win_length)
+    player = _book_players[piece]
+    position = Position.from_board(board, win_length)
+    player.evaluator.attach(position)
+    score, move = player.search_root(position, depth, None, None)
+    key, mirrored = canonical_key(position)
+    score = SCORE_LIMIT if score == float('inf') else -SCORE_LIMIT if score == float('-inf') else int(score)
+    return key, (len(board[0]) - 1 - move if mirrored else move), score
+
+
+def write_book(path, entries, row_count, col_count, depth, win_length=4):
+    """Write (key, move, score) entries to a book file, sorted by key."""
+    entries = sorted(entries)
+    with open(path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, VERSION, row_count, col_count, win_length, depth, len(entries)))
+        for key, move, score in entries:
+            file.write(ENTRY.pack(key, move, score))
+
+
+def build_book(path, plies=8, depth=12, row_count=6, col_count=7, search='pvs', workers=None, win_length=4):
+    """
+    Build an opening book offline by searching every early position deeply.
+
+    Parameters:
+        path (str): The file the book is written to.
+        plies (int): The number of opening plies covered by the book (default is 8).
+        depth (int): The search depth of every book position (default is 12).
+        row_count (int): The number of rows of the board (default is 6).
+        col_count (int): The number of columns of the board (default is 7).
+        search (str): The search algorithm, 'minimax' or 'pvs' (default is 'pvs').
+        workers (int): The number of worker processes (default is one per core).
+        win_length (int): The number of pieces in a row that wins (default is 4).
+
+    Returns:
+        int: The number of positions in the book.
+    """
+    if (row_count + 1) * col_count > 64:
+        raise ValueError("book keys only fit boards with at most 64 bits")
+    tasks = [(board, piece, depth, search, win_length) for board, piece in book_positions(plies, row_count, col_count, win_length)]
+    with Pool(workers) as pool:
+        entries = pool.map(search_book_position, tasks, chunksize=16)
+    write_book(path, entries, row_count, col_count, depth, win_length)
+    return len(entries)
+
+
+if __name__ == "__main__":
+    # Usage: python book.py <path> [plies] [depth]
+    book_path = sys.argv[1] if len(sys.argv) > 1 else 'opening.book'
+    book_plies = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    book_depth = int(sys.argv[3]) if len(sys.argv) > 3 else 12
+    print(f"Wrote {build_book(book_path, book_plies, book_depth)} positions to {book_path}")
@@ -0,0 +1,85 @@
+from bitboard import cell_windows
+
+
+class IncrementalEvaluator:
+    """Class keeping a position's evaluation up to date as pieces are placed and removed.
+
+    Every window's contents are encoded as ``player1_count * (win_length + 1) + player2_count``.
+    Placing or removing a piece only touches the windows that contain its cell,
+    so both players' scores are always available in O(1).
+    """
+
+    def __init__(self, row_count, col_count, give_score, center_weight=4, win_length=4):
+        """Initialize the evaluator from a window scoring function (own pieces, empty spaces)."""
+        self.row_count = row_count  # Number of rows in the game board
+        self.col_count = col_count  # Number of columns in the game board
+        self.cell_windows = cell_windows(row_count, col_count, win_length)  # Window ids containing each bit index
+        self.window_count = sum(len(ids) for ids in self.cell_windows) // win_length  # Number of win_length-cell windows
+        stride = row_count + 1  # Bits per column, including the sentinel bit
+        center = col_count // 2
+        self.center_bonus = [center_weight if index // stride == center and index % stride < row_count else 0
+                             for index in range(col_count * stride)]  # Bonus for a piece on each bit index
+        # Window score of each player for every encoded window state
+        base = win_length + 1  # Number of possible piece counts of one player in a window
+        state_count = base * base
+        scores = [[0] * state_count, [0] * state_count]
+        for player1_count in range(base):
+            for player2_count in range(base - player1_count):
+                state = player1_count * base + player2_count
+                empty_spaces = win_length - player1_count - player2_count
+                scores[0][state] = give_score(player1_count, empty_spaces)
+                scores[1][state] = give_score(player2_count, empty_spaces)
+        self.steps = (base, 1)  # State increment for a piece of player 1 and player 2
+        # Change in both players' scores when a piece of each player is added to a window state
+        self.gains = tuple((tuple(scores[0][state + step] - scores[0][state] if state + step < state_count else 0 for state in range(state_count)),
+                            tuple(scores[1][state + step] - scores[1][state] if state + step < state_count else 0 for state in range(state_count)))
+                           for step in self.steps)
+        self.states = [0] * self.window_count  # Encoded contents of every window
+        self.scores = [0, 0]  # Running evaluation of player 1 and player 2
+
+    def attach(self, position):
+        """Rebuild the running state from the position and follow its future moves."""
+        self.states = [0] * self.window_count
+        self.scores = [0, 0]
+        position.evaluator = None  # Avoid double counting while replaying the existing pieces
+        for piece in (1, 2):
+            bitboard = position.bitboards[piece - 1]
+            while bitboard:
+                lowest = bitboard & -bitboard  # Lowest set bit
+                self.place(lowest.bit_length() - 1, piece)
+                bitboard ^= lowest
+        position.evaluator = self
+
+    def place(self, index, piece):
+        """Update the running state for a piece placed on the bit index."""
+        states = self.states
+        step = self.steps[piece - 1]
+        gain1, gain2 = self.gains[piece - 1]
+        score1 = score2 = 0
+        for window in self.cell_windows[index]:
+            state = states[window]
+            score1 += gain1[state]
+            score2 += gain2[state]
+            states[window] = state + step
+        self.scores[0] += score1
+        self.scores[1] += score2
+        self.scores[piece - 1] += self.center_bonus[index]
+
+    def remove(self, index, piece):
+        """Update the running state for a piece removed from the bit index."""
+        states = self.states
+        step = self.steps[piece - 1]
+        gain1, gain2 = self.gains[piece - 1]
+        score1 = score2 = 0
+        for window in self.cell_windows[index]:
+            state = states[window] - step
+            score1 += gain1[state]
+            score2 += gain2[state]
+            states[window] = state
+        self.scores[0] -= score1
+        self.scores[1] -= score2
+        self.scores[piece - 1] -= self.center_bonus[index]
+
+    def evaluate(self, piece):
+        """Return the evaluation of the position from the piece's point of view."""
+        return self.scores[piece - 1]
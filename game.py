@@ -0,0 +1,190 @@
+import random
+
+class Game:
+    """Class representing the Connect 4 game state and rules, without any display."""
+
+    def __init__(self, row_count=6, col_count=7, win_length=4):
+        """Initialize the Connect 4 game state."""
+        self.row_count = row_count # Number of rows in the game board
+        self.col_count = col_count # Number of columns in the game board
+        self.win_length = win_length # Number of pieces in a row that wins
+        self.nodes_count_aiplayer1 = []  # Initialize the list of nodes count for AI player 1
+        self.execution_times_aiplayer1 = []  # Initialize the list of execution times for AI player 1
+        self.nodes_count_aiplayer2 = []  # Initialize the list of nodes count for AI player 2
+        self.execution_times_aiplayer2 = []  # Initialize the list of execution times for AI player 2
+        self.tt_stats_aiplayer1 = []  # Initialize the list of transposition table stats for AI player 1
+        self.tt_stats_aiplayer2 = []  # Initialize the list of transposition table stats for AI player 2
+        self.depths_reached_aiplayer1 = []  # Initialize the list of search depths reached by AI player 1
+        self.depths_reached_aiplayer2 = []  # Initialize the list of search depths reached by AI player 2
+        self.endgame_stats_aiplayer1 = []  # Initialize the list of endgame solver stats for AI player 1
+        self.endgame_stats_aiplayer2 = []  # Initialize the list of endgame solver stats for AI player 2
+        self.search_stats_aiplayer1 = []  # Initialize the list of SearchStats for AI player 1
+        self.search_stats_aiplayer2 = []  # Initialize the list of SearchStats for AI player 2
+        self.winner = None # Winner of the game
+        self.player1_piece = 1 # Piece of player 1
+        self.player2_piece = 2 # Piece of player 2
+        self.board = [[0 for _ in range(col_count)] for _ in range(row_count)]  # Initialize the game board
+        self.moves = []  # Columns played so far, in order
+        self.turn = 0  # Player turn: 0 for player 1, 1 for player 2
+        self.game_over = False  # Flag to indicate if the game is over
+
+    def __str__(self):
+        """Return a string representation of the board."""
+        output = ""
+        for row in self.board:
+            output += '\n' + str(row)
+        return output
+
+    def drop_piece(self, col):
+        """Drop a piece into the specified column."""
+        if self.board[0][col] == 0:  # Check if the top row of the column is empty
+            # Iterate through rows from bottom to top
+            for row in range(len(self.board) - 1, -1, -1):
+                if self.board[row][col] == 0:  # Find the first empty row in the column
+                    self.turn += 1  # Increment turn counter
+                    self.board[row][col] += self.turn  # Place player's piece in the board
+                    self.turn %= 2  # Alternate player turn
+                    self.moves.append(col)  # Record the move
+                    return row  # Return the row where the piece was dropped
+
+    def check_connection(self, piece, stack):
+        """Check for a win condition based on the current piece and stack."""
+        if piece == 0:
+            stack = []  # If the current piece is empty, reset the stack
+        elif stack and stack[-1] == piece:
+            stack.append(piece)  # Add the piece to the stack
+            if len(stack) >= self.win_length:  # If there are win_length or more consecutive pieces
+                return True, stack[-1]  # Return True for win and the winning piece
+        else:
+            stack = [piece]  # Start a new stack with the current piece
+        return stack, None  # Return the updated stack and no winner
+
+    def find_starting_diagonal(self, col_num, row_num, sign):
+        """Find the starting point of a diagonal based on its direction."""
+        if sign == 'positive':  # For positive diagonal
+            jump = min(col_num, (self.row_count - 1) - row_num)  # Calculate jump distance
+            point = [col_num - jump, row_num + jump]  # Calculate starting point
+        elif sign == 'negative':  # For negative diagonal
+            jump = min(col_num, row_num)  # Calculate jump distance
+            point = [col_num - jump, row_num - jump]  # Calculate starting point
+        return point  # Return the starting point
+    
+    def check_win(self, board, col_num, row_num):
+        """Check for a win condition on the board."""
+        if col_num == None and row_num == None:  # If the board is empty
+            return False, None  # Return False for no win and no winner
+        stack = []  # Initialize a stack to keep track of consecutive pieces
+
+        # Check for horizontal win
+        for piece in board[row_num]:  # Iterate through pieces in the current row
+            stack, winner = self.check_connection(piece, stack)  # Check for consecutive pieces
+            if stack == True:  # If there are win_length or more consecutive pieces
+                return True, winner  # Return True for win and the winner's piece value
+
+        # Check for vertical win
+        stack = []  # Reset the stack for vertical check
+        for row in range(len(board)):  # Iterate through rows in the board
+            piece = board[row][col_num]  # Get the piece in the current column
+            stack, winner = self.check_connection(piece, stack)  # Check for consecutive pieces
+            if stack == True:  # If there are win_length or more consecutive pieces
+                return True, winner  # Return True for win and the winner's piece value
+
+        # Check for positive diagonal win
+        positive_diagonal = self.find_starting_diagonal(col_num, row_num, 'positive')  # Find starting point for positive diagonal
+        stack = []  # Reset the stack for diagonal check
+        for row in range(positive_diagonal[1], -1, -1):  # Iterate through rows in the positive diagonal direction
+            if positive_diagonal[0] == self.col_count or row == self.row_count:  # If out of bounds
+                break
+            piece = board[row][positive_diagonal[0]]  # Get the piece in the diagonal
+            positive_diagonal[0] += 1  # Move to the next column in diagonal
+            stack, winner = self.check_connection(piece, stack)  # Check for consecutive pieces
+            if stack == True:  # If there are win_length or more consecutive pieces
+                return True, winner  # Return True for win and the winner's piece value
+
+        # Check for negative diagonal win
+        negative_diagonal = self.find_starting_diagonal(col_num, row_num, 'negative')  # Find starting point for negative diagonal
+        stack = []  # Reset the stack for diagonal check
+        for row in range(negative_diagonal[1], self.row_count):  # Iterate through rows in the negative diagonal direction
+            if negative_diagonal[0] == self.col_count or row == self.row_count:  # If out of bounds
+                break
+            piece = board[row][negative_diagonal[0]]  # Get the piece in the diagonal
+            stack, winner = self.check_connection(piece, stack)  # Check for consecutive pieces
+            if stack == True:  # If there are win_length or more consecutive pieces
+                return True, winner  # Return True for win and the winner's piece value
+            negative_diagonal[0] += 1  # Move to the next column in diagonal
+
+        return False, None  # Return False for no win, and no winner's piece value
+
+    def check_draw(self):
+        """Check if the game has ended in a draw."""
+        return self.board[0].count(0) == 0
+
+    def play_move(self, col):
+        """Drop a piece into the column and update the winner and game over flags."""
+        row = self.drop_piece(col)  # Drop the piece into the selected column
+        if row is not None:  # If a piece is successfully dropped
+            win, winner = self.check_win(self.board, col, row)  # Check for win
+            self.winner = winner
+            if win or self.check_draw():  # If there is a winner or the board is full
+                self.game_over = True  # Mark game as over
+        return row  # Return the row where the piece was dropped
+
+    def record_output(self, player, output):
+        """Record the search stats returned by an AI player's select_move."""
+        if player == 1:
+            self.nodes_count_aiplayer1 += output[1]
+            self.execution_times_aiplayer1 += output[2]
+            self.tt_stats_aiplayer1 += output[3]
+            self.depths_reached_aiplayer1 += output[4]
+            self.endgame_stats_aiplayer1 += output[5]
+            self.search_stats_aiplayer1 += output[6]
+        else:
+            self.nodes_count_aiplayer2 += output[1]
+            self.execution_times_aiplayer2 += output[2]
+            self.tt_stats_aiplayer2 += output[3]
+            self.depths_reached_aiplayer2 += output[4]
+            self.endgame_stats_aiplayer2 += output[5]
+            self.search_stats_aiplayer2 += output[6]
+
+    def get_stats(self):
+        """Return the per-move search stats of both AI players and the winner."""
+        return self.nodes_count_aiplayer1,self.execution_times_aiplayer1,self.nodes_count_aiplayer2,self.execution_times_aiplayer2,self.winner,self.tt_stats_aiplayer1,self.tt_stats_aiplayer2,self.depths_reached_aiplayer1,self.depths_reached_aiplayer2,self.endgame_stats_aiplayer1,self.endgame_stats_aiplayer2,self.search_stats_aiplayer1,self.search_stats_aiplayer2
+
+
+def play_game(player1, player2, seed=None, row_count=6, col_count=7, recorder=None, win_length=4, opening=(), configs=None):
+    """Play a full game between two AI players as fast as possible and return the finished game.
+
+    The players only need a select_move(board, col_num, row_num) method returning the
+    same output as AIPlayer.select_move. The seed makes the AI players' random choices reproducible.
+    A recorder (such as records.GameRecordWriter) is told about the game, every move and the result.
+    The board size and win_length must match the ones the players were created with.
+    The opening columns are played before the AI players take over; they are recorded without scores.
+    The recorder stores configs as the two players' configurations, by default each AI player's player_config().
+    """
+    if seed is not None:
+        random.seed(seed)  # The AI players draw from the shared random module
+    game = Game(row_count, col_count, win_length)
+    players = (player1, player2)
+    if recorder is not None:
+        if configs is None:
+            configs = [player.player_config() if hasattr(player, 'player_config') else {'player': type(player).__name__}
+                       for player in players]
+        recorder.begin_game(seed, configs)
+    col_num, row_num = None, None  # Last move played
+    for col_num in opening:
+        row_num = game.play_move(col_num)
+        if recorder is not None:
+            recorder.add_move(col_num)
+    while not game.game_over:
+        player = game.turn + 1
+        output = players[game.turn].select_move(game.board, col_num, row_num)  # AI player selects a move
+        game.record_output(player, output)
+        col_num = output[0]
+        if recorder is not None:
+            searched = bool(output[1])  # Random moves of the lower difficulties are not searched
+            scores = getattr(players[game.turn], 'scores', None)
+            recorder.add_move(col_num, scores[-1] if searched and scores else None, output[1][0] if searched else None)
+        row_num = game.play_move(col_num)
+    if recorder is not None:
+        recorder.end_game(game.winner)
+    return game
@@ -0,0 +1,200 @@
+import cProfile
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+
+
+class SearchStats:
+    """Class collecting structured statistics about one or more searches.
+
+    The search only calls into this class when an AI player is created with
+    ``instrument=True``; otherwise the player's ``stats`` attribute is None and
+    each node pays a single ``is not None`` check. Depths are counted in plies
+    from the root of the search.
+    """
+
+    PHASES = ('evaluate', 'terminal_check', 'transposition', 'move_ordering', 'make_unmake')
+
+    def __init__(self):
+        """Initialize empty counters."""
+        self.nodes_by_ply = []  # Number of nodes visited at each ply
+        self.cutoffs_by_ply = []  # Number of beta cutoffs at each ply
+        self.cutoff_move_index = []  # Number of cutoffs caused by the first, second, ... move searched
+        self.leaf_nodes = 0  # Nodes scored without searching their children
+        self.interior_nodes = 0  # Nodes whose children were searched
+        self.children_searched = 0  # Children searched by the interior nodes
+        self.tt_cutoffs = 0  # Nodes answered by the transposition table
+        self.phase_times = dict.fromkeys(self.PHASES, 0.0)  # Seconds spent in each phase of the search
+        self.search_time = 0.0  # Seconds spent searching
+        self.active_phase = None  # Phase being timed, so nested calls are not counted twice
+        self.profile = None  # Hottest functions of the profiled searches, if profiling was enabled
+
+    def reserve(self, ply):
+        """Make room for the counters of every ply up to the given one."""
+        while len(self.nodes_by_ply) <= ply:
+            self.nodes_by_ply.append(0)
+            self.cutoffs_by_ply.append(0)
+
+    def node(self, ply):
+        """Count a node visited at the ply."""
+        if len(self.nodes_by_ply) <= ply:
+            self.reserve(ply)
+        self.nodes_by_ply[ply] += 1
+
+    def interior(self, children):
+        """Count an interior node and the children it searched."""
+        self.interior_nodes += 1
+        self.children_searched += children
+
+    def cutoff(self, ply, index):
+        """Count a cutoff at the ply caused by the move searched at the index."""
+        self.cutoffs_by_ply[ply] += 1
+        while len(self.cutoff_move_index) <= index:
+            self.cutoff_move_index.append(0)
+        self.cutoff_move_index[index] += 1
+
+    def instrument(self, player, position):
+        """Time the phases of the player's search of the position by wrapping the methods the search calls."""
+        timed_methods = ((player, 'evaluate_state', 'evaluate'), (player.evaluator, 'evaluate', 'evaluate'),
+                         (player, 'is_terminal_node', 'terminal_check'), (player, 'check_win', 'terminal_check'),
+                         (position, 'has_won', 'terminal_check'),
+                         (player, 'valid_moves', 'move_ordering'), (player, 'order_moves', 'move_ordering'),
+                         (position, 'make_move', 'make_unmake'), (position, 'unmake_move', 'make_unmake'))
+        if player.transposition_table is not None:
+            timed_methods += ((player.transposition_table, 'probe', 'transposition'),
+                              (player.transposition_table, 'store', 'transposition'))
+        for owner, name, phase in timed_methods:
+            method = getattr(type(owner), name).__get__(owner)  # The class's method, not an earlier wrapper
+            setattr(owner, name, self.timed(phase, method))
+
+    def timed(self, phase, function):
+        """Return a wrapper of the function that adds its running time to the phase."""
+        def wrapper(*args):
+            if self.active_phase is not None:  # Already timed by an enclosing phase
+                return function(*args)
+            self.active_phase = phase
+            start_time = time.perf_counter()
+            try:
+                return function(*args)
+            finally:
+                self.phase_times[phase] += time.perf_counter() - start_time
+                self.active_phase = None
+        return wrapper
+
+    def nodes(self):
+        """Return the number of nodes visited."""
+        return sum(self.nodes_by_ply)
+
+    def branching_factor(self):
+        """Return the average number of children searched per interior node."""
+        return self.children_searched / self.interior_nodes if self.interior_nodes else 0.0
+
+    def merge(self, other):
+        """Add another SearchStats' counters to this one."""
+        self.reserve(len(other.nodes_by_ply) - 1)
+        for ply, count in enumerate(other.nodes_by_ply):
+            self.nodes_by_ply[ply] += count
+            self.cutoffs_by_ply[ply] += other.cutoffs_by_ply[ply]
+        for index, count in enumerate(other.cutoff_move_index):
+            while len(self.cutoff_move_index) <= index:
+                self.cutoff_move_index.append(0)
+            self.cutoff_move_index[index] += count
+        self.leaf_nodes += other.leaf_nodes
+        self.interior_nodes += other.interior_nodes
+        self.children_searched += other.children_searched
+        self.tt_cutoffs += other.tt_cutoffs
+        for phase, seconds in other.phase_times.items():
+            self.phase_times[phase] += seconds
+        self.search_time += other.search_time
+        return self
+
+    @classmethod
+    def combine(cls, stats_list):
+        """Return the sum of several SearchStats, e.g. every move of a game (None entries are skipped)."""
+        total = cls()
+        for stats in stats_list:
+            if stats is not None:
+                total.merge(stats)
+        return total
+
+    def to_dict(self):
+        """Return the statistics as a JSON-serializable dict."""
+        cutoffs = sum(self.cutoff_move_index)
+        timed = sum(self.phase_times.values())
+        return {'nodes': self.nodes(), 'nodes_by_ply': list(self.nodes_by_ply),
+                'cutoffs_by_ply': list(self.cutoffs_by_ply), 'cutoff_move_index': list(self.cutoff_move_index),
+                'first_move_cutoff_rate': self.cutoff_move_index[0] / cutoffs if cutoffs else 0.0,
+                'leaf_nodes': self.leaf_nodes, 'interior_nodes': self.interior_nodes,
+                'branching_factor': self.branching_factor(), 'tt_cutoffs': self.tt_cutoffs,
+                'phase_times': dict(self.phase_times, other=max(0.0, self.search_time - timed)),
+                'search_time': self.search_time, 'profile': self.profile}
+
+
+class SamplingProfiler:
+    """Class sampling the innermost function of one thread at a fixed interval.
+
+    Sampling costs the searching thread almost nothing, unlike cProfile, so
+    the relative times it reports are closer to an uninstrumented search.
+    """
+
+    def __init__(self, interval=0.001):
+        """Initialize the profiler with the time between samples in seconds."""
+        self.interval = interval  # Seconds between samples
+        self.samples = Counter()  # Number of samples in which each function was running
+        self.thread_id = None  # Thread being sampled
+        self.running = False
+        self.thread = None
+
+    def sample(self):
+        """Take samples until stop is called; this runs on the sampler thread."""
+        while self.running:
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                code = frame.f_code
+                self.samples[f"{code.co_filename.rsplit('/', 1)[-1]}:{code.co_name}"] += 1
+            time.sleep(self.interval)
+
+    def start(self):
+        """Start sampling the calling thread."""
+        self.thread_id = threading.get_ident()
+        self.running = True
+        self.thread = threading.Thread(target=self.sample, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stop sampling."""
+        self.running = False
+        self.thread.join()
+
+    def top(self, count=20):
+        """Return the most sampled functions as (function, share of the samples) pairs."""
+        total = sum(self.samples.values())
+        return [(name, samples / total) for name, samples in self.samples.most_common(count)]
+
+
+def start_profiler(kind):
+    """Start a 'cprofile' or 'sample' profiler and return it."""
+    if kind == 'cprofile':
+        profiler = cProfile.Profile()
+        profiler.enable()
+        return profiler
+    if kind == 'sample':
+        profiler = SamplingProfiler()
+        profiler.start()
+        return profiler
+    raise ValueError(f"unknown profiler {kind!r}; use 'cprofile' or 'sample'")
+
+
+def stop_profiler(profiler, count=20):
+    """Stop a profiler started by start_profiler and return its hottest functions."""
+    if isinstance(profiler, SamplingProfiler):
+        profiler.stop()
+        return profiler.top(count)
+    profiler.disable()
+    rows = []
+    stats = pstats.Stats(profiler).stats
+    for (filename, line, name), (_, calls, own_time, total_time, _) in sorted(stats.items(), key=lambda item: -item[1][2])[:count]:
+        rows.append((f"{filename.rsplit('/', 1)[-1]}:{name}", calls, own_time, total_time))
+    return rows
@@ -0,0 +1,191 @@
+import math
+import random
+import time
+from array import array
+
+
+class MCTS:
+    """Class running Monte Carlo tree search (UCT) over a fixed-size node pool.
+
+    Every node is an index into parallel typed arrays holding its visit
+    count, total result, first child, child count, move, Zobrist key and
+    terminal state. A node's children are allocated together, so a node
+    costs about 27 bytes and no Python object. Results are stored from the
+    point of view of the player who made the move into the node: 1 for a
+    win, 0.5 for a draw and 0 for a loss. After a move, the subtree of the
+    reached position becomes the root of the next search.
+    """
+
+    def __init__(self, row_count=6, col_count=7, max_nodes=500000, exploration=1.4, rollout='heuristic'):
+        """Allocate the node pool."""
+        self.row_count = row_count  # Number of rows in the game board
+        self.col_count = col_count  # Number of columns in the game board
+        self.cells = row_count * col_count  # Number of plies in a full game
+        self.max_nodes = max_nodes  # Capacity of the node pool
+        self.exploration = exploration  # UCT exploration constant
+        self.rollout_policy = rollout  # 'random' or 'heuristic' (win if possible, otherwise block, otherwise random)
+        self.visits = array('I', [0]) * max_nodes  # Number of playouts through each node
+        self.results = array('d', [0.0]) * max_nodes  # Sum of the playout results of each node
+        self.first_child = array('I', [0]) * max_nodes  # Index of each node's first child
+        self.child_count = array('B', [0]) * max_nodes  # Number of children of each node (0 until expanded)
+        self.moves = array('b', [-1]) * max_nodes  # Column played to reach each node
+        self.keys = array('Q', [0]) * max_nodes  # Zobrist key of each node's position
+        self.terminal = array('B', [0]) * max_nodes  # 1 if the move into the node won, 2 if it filled the board
+        self.size = 0  # Number of nodes in use
+        self.root = 0  # Index of the root node
+        self.playouts = 0  # Number of playouts of the last search
+        self.max_depth = 0  # Deepest node reached by the last search
+
+    def reset(self, key):
+        """Empty the pool and make a new root for the position with the given key."""
+        self.size = 1
+        self.root = 0
+        self.visits[0], self.results[0], self.child_count[0], self.moves[0] = 0, 0.0, 0, -1
+        self.keys[0], self.terminal[0] = key, 0
+
+    def set_root(self, position):
+        """Reuse the subtree of the position if the tree holds it, otherwise start a new tree."""
+        if self.size:
+            if self.keys[self.root] == position.key:
+                return
+            first = self.first_child[self.root]
+            for child in range(first, first + self.child_count[self.root]):  # The opponent's reply to the last move
+                if self.keys[child] == position.key:
+                    self.root = child
+                    return
+        self.reset(position.key)
+
+    def expand(self, node, position, piece):
+        """Create the children of the node, where the piece is to move; returns False if the pool is full."""
+        moves = position.valid_moves()
+        if self.size + len(moves) > self.max_nodes:
+            return False
+        first = self.size
+        full = position.piece_count() + 1 == self.cells
+        zobrist = position.zobrist[piece - 1]
+        for offset, col in enumerate(moves):
+            child = first + offset
+            self.visits[child], self.results[child], self.child_count[child] = 0, 0.0, 0
+            self.moves[child] = col
+            self.keys[child] = position.key ^ zobrist[position.heights[col]]
+            self.terminal[child] = 1 if position.is_winning_move(col, piece) else 2 if full else 0
+        self.first_child[node] = first
+        self.child_count[node] = len(moves)
+        self.size += len(moves)
+        return True
+
+    def select_child(self, node):
+        """Return the child of the node with the highest UCT value."""
+        first = self.first_child[node]
+        visits, results = self.visits, self.results
+        log_visits = math.log(visits[node] or 1)
+        best_child, best_value = first, -1.0
+        for child in range(first, first + self.child_count[node]):
+            if visits[child] == 0:  # Try every move once first
+                return child
+            value = results[child] / visits[child] + self.exploration * math.sqrt(log_visits / visits[child])
+            if value > best_value:
+                best_child, best_value = child, value
+        return best_child
+
+    def rollout(self, position, piece):
+        """Play out the game from the position with the piece to move and return the winner (0 for a draw)."""
+        played = 0
+        winner = 0
+        heuristic = self.rollout_policy == 'heuristic'
+        while True:
+            moves = position.valid_moves()
+            if not moves:  # Draw
+                break
+            move = None
+            if heuristic:
+                for col in moves:
+                    if position.is_winning_move(col, piece):
+                        move = col
+                        break
+                if move is None:
+                    for col in moves:  # Block the opponent's win
+                        if position.is_winning_move(col, 3 - piece):
+                            move = col
+                            break
+            if move is None:
+                move = random.choice(moves)
+            if position.is_winning_move(move, piece):
+                winner = piece
+                break
+            position.make_move(move, piece)
+            played += 1
+            piece = 3 - piece
+        for _ in range(played):
+            position.unmake_move()
+        return winner
+
+    def playout(self, position, piece):
+        """Run one selection, expansion, rollout and backpropagation from the root."""
+        node = self.root
+        path = [node]
+        mover = 3 - piece  # Player who made the move into the current node
+        while self.child_count[node] and not self.terminal[node]:  # Walk down the expanded part of the tree
+            node = self.select_child(node)
+            mover = 3 - mover
+            position.make_move(self.moves[node], mover)
+            path.append(node)
+        if not self.terminal[node] and (self.visits[node] or node == self.root) and self.expand(node, position, 3 - mover):
+            node = self.select_child(node)  # Expand on the second visit, so leaves seen once cost no children
+            mover = 3 - mover
+            position.make_move(self.moves[node], mover)
+            path.append(node)
+        if self.terminal[node] == 1:
+            winner = mover
+        elif self.terminal[node] == 2:
+            winner = 0
+        else:
+            winner = self.rollout(position, 3 - mover)
+        for _ in range(len(path) - 1):
+            position.unmake_move()
+        self.max_depth = max(self.max_depth, len(path) - 1)
+        for node in reversed(path):  # Score every node for the player who moved into it
+            self.visits[node] += 1
+            self.results[node] += 0.5 if winner == 0 else 1.0 if winner == mover else 0.0
+            mover = 3 - mover
+
+    def search(self, position, piece, playouts=None, deadline=None, stop_flag=None):
+        """
+        Search the position for the piece to move until the playout or time budget is spent.
+        At least one playout always runs, even if the deadline has already passed.
+
+        Parameters:
+            position (Position): The position to search; it is restored before returning.
+            piece (int): The piece to move.
+            playouts (int): The number of playouts, or None to search until the deadline.
+            deadline (float): The perf_counter time at which to stop, or None.
+            stop_flag: An object whose value is set to stop the search early, or None.
+
+        Returns:
+            tuple: The most visited move and its average result between 0 and 1.
+        """
+        if self.size > self.max_nodes * 0.9:  # Start over rather than run out of nodes mid-search
+            self.reset(position.key)
+        self.set_root(position)
+        self.playouts = 0
+        self.max_depth = 0
+        while True:  # Always run one playout, which expands the root, so there is a move to return
+            self.playout(position, piece)
+            self.playouts += 1
+            if playouts is not None and self.playouts >= playouts:
+                break
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            if stop_flag is not None and self.playouts % 64 == 0 and stop_flag.value:
+                break
+        first = self.first_child[self.root]
+        best_child = max(range(first, first + self.child_count[self.root]), key=lambda child: self.visits[child])
+        self.root = best_child  # Keep the subtree of the chosen move for the next search
+        return self.moves[best_child], self.results[best_child] / max(1, self.visits[best_child])
+
+    def predict_reply(self, key):
+        """Return the most visited reply in the position with the given key if it is the root, or None."""
+        if not self.size or self.keys[self.root] != key or not self.child_count[self.root]:
+            return None
+        first = self.first_child[self.root]
+        return self.moves[max(range(first, first + self.child_count[self.root]), key=lambda child: self.visits[child])]
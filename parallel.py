@@ -0,0 +1,145 @@
+import time
+from multiprocessing import Pool, TimeoutError
+from multiprocessing.sharedctypes import RawValue
+from bitboard import Position
+from ai import AIPlayer, SearchTimeout
+from transposition import SharedTranspositionTable
+
+_worker_player = None  # AI player of the current worker process
+
+
+def init_worker(config, table_array, stop_flag):
+    """Create the worker process's AI player; it shares the stop flag and, for Lazy SMP, the hash table."""
+    global _worker_player
+    _worker_player = AIPlayer(**config)
+    if table_array is not None:
+        _worker_player.transposition_table = SharedTranspositionTable(array=table_array)
+    _worker_player.stop_flag = stop_flag
+
+
+def start_search(board):
+    """Prepare the worker's AI player for a search of the board and return the position."""
+    player = _worker_player
+    position = Position.from_board(board, player.win_length)
+    player.evaluator.attach(position)
+    player.total_nodes_evaluated = 0
+    player.killer_moves = []
+    player.deadline = float('inf')  # Only the stop flag ends worker searches
+    return player, position
+
+
+def search_root_move(task):
+    """Search the position after one root move; this runs inside a worker process."""
+    board, move, depth = task
+    player, position = start_search(board)
+    row = position.make_move(move, player.ai_piece)
+    try:
+        if player.search == 'pvs':
+            score = -player.negamax(position, depth - 1, float('-inf'), float('inf'), player.opponent_piece, move, row, 1)[0]
+        else:
+            score = player.minimax(position, depth - 1, float('-inf'), float('inf'), False, move, row)[0]
+    except SearchTimeout:
+        score = None  # The search was stopped before it finished
+    return move, score, player.total_nodes_evaluated
+
+
+def search_helper(task):
+    """Search the root as a Lazy SMP helper, starting from a different move; this runs inside a worker process."""
+    board, col_num, row_num, depth, first_move = task
+    player, position = start_search(board)
+    player.pv_moves = {position.key: first_move}  # Make each helper explore the tree in a different order
+    try:
+        player.sequential_search(position, depth, col_num, row_num)
+    except SearchTimeout:
+        pass  # The main search finished first
+    return player.total_nodes_evaluated
+
+
+class ParallelSearch:
+    """Class running one AI player's searches on a pool of worker processes.
+
+    In 'root' mode the root moves are split between the workers and each child
+    position is searched with a full window, so the best score is exactly the
+    sequential one. In 'lazy' mode the calling process runs the normal search
+    while helper processes search the same root in different move orders and
+    fill a shared transposition table with results the main search reuses.
+    """
+
+    def __init__(self, player, workers, mode='root'):
+        """Start the worker processes for the player."""
+        self.workers = workers  # Number of processes searching, including the caller in 'lazy' mode
+        self.mode = mode  # 'root' (root splitting) or 'lazy' (Lazy SMP)
+        self.stop_flag = RawValue('b', 0)  # Set to stop the worker searches
+        config = player.worker_config()
+        table_array = player.transposition_table.array if mode == 'lazy' and player.transposition_table is not None else None
+        pool_size = workers if mode == 'root' else workers - 1
+        self.pool = Pool(pool_size, initializer=init_worker, initargs=(config, table_array, self.stop_flag))
+
+    def wait(self, pending, deadline, stop_flag=None):
+        """Wait for an asynchronous result, raising SearchTimeout once the deadline passes or the stop flag is set."""
+        if deadline is None:
+            deadline = float('inf')
+        if deadline == float('inf') and stop_flag is None:  # Nothing can stop the search
+            return pending.get()
+        while True:
+            timeout = max(0.0, deadline - time.perf_counter())
+            if stop_flag is not None:
+                timeout = min(timeout, 0.01)  # Poll the stop flag every 10 ms
+            try:
+                return pending.get(timeout)
+            except TimeoutError:
+                if time.perf_counter() >= deadline or (stop_flag is not None and stop_flag.value):
+                    raise SearchTimeout()
+
+    def finish(self, pending):
+        """Stop the worker searches, wait for them and return their results."""
+        self.stop_flag.value = 1
+        results = [result.get() for result in pending]
+        self.stop_flag.value = 0
+        return results
+
+    def root_split(self, player, position, depth, col_num, row_num):
+        """Search every root move on a worker and return the best score and move."""
+        if player.is_terminal_node(position, col_num, row_num) or depth == 0:  # Nothing to split
+            return player.sequential_search(position, depth, col_num, row_num)
+        board = position.to_board()
+        moves = player.valid_moves(position)
+        if position.key in player.pv_moves:  # Search the principal variation move first
+            moves.remove(player.pv_moves[position.key])
+            moves.insert(0, player.pv_moves[position.key])
+        pending = [self.pool.apply_async(search_root_move, ((board, move, depth),)) for move in moves]
+        player.total_nodes_evaluated += 1  # The root node
+        best_score, best_move = float('-inf'), moves[0]
+        for index, result in enumerate(pending):
+            try:
+                move, score, nodes = self.wait(result, player.deadline, player.stop_flag)
+            except SearchTimeout:  # Stop the searches still running, through the workers' own flag, and count their nodes
+                for _, _, nodes in self.finish(pending[index:]):
+                    player.total_nodes_evaluated += nodes
+                raise
+            player.total_nodes_evaluated += nodes
+            if score > best_score:
+                best_score, best_move = score, move
+        return best_score, best_move
+
+    def lazy_smp(self, player, position, depth, col_num, row_num):
+        """Run the main search while helper processes search the same root."""
+        board = position.to_board()
+        moves = player.valid_moves(position)
+        pending = [self.pool.apply_async(search_helper, ((board, col_num, row_num, depth, moves[(helper + 1) % len(moves)]),))
+                   for helper in range(self.workers - 1)] if moves else []
+        try:
+            return player.sequential_search(position, depth, col_num, row_num)
+        finally:
+            player.total_nodes_evaluated += sum(self.finish(pending))
+
+    def search(self, player, position, depth, col_num, row_num):
+        """Search the position to the given depth in parallel."""
+        if self.mode == 'lazy':
+            return self.lazy_smp(player, position, depth, col_num, row_num)
+        return self.root_split(player, position, depth, col_num, row_num)
+
+    def close(self):
+        """Stop the worker processes."""
+        self.pool.terminate()
+        self.pool.join()
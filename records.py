@@ -0,0 +1,224 @@
+import json
+import math
+import mmap
+import os
+import struct
+import sys
+import zlib
+from game import Game
+
+FILE_HEADER = struct.Struct('<4sBBBB')  # Magic, version, row count, column count, win length
+RECORD_HEADER = struct.Struct('<BI')  # Record type, payload length
+GAME_HEADER = struct.Struct('<QIIBBH')  # Seed, player 1 config id, player 2 config id, winner, flags, move count
+MAGIC = b'C4GR'
+VERSION = 2
+CONFIG_RECORD = 0  # Payload is a player configuration as JSON
+GAME_RECORD = 1  # Payload is a game header, the packed moves and the optional per-move data
+HAS_SCORES = 1  # Flag: a float32 score follows for every move
+HAS_NODES = 2  # Flag: a uint32 node count follows for every move
+NO_SEED = 2 ** 64 - 1  # Stored seed of an unseeded game
+
+
+def move_bits(col_count):
+    """Return the number of bits a move takes on a board with the given number of columns."""
+    return max(1, (col_count - 1).bit_length())
+
+
+def config_id(config):
+    """Return the 32-bit id of a player configuration."""
+    return zlib.crc32(json.dumps(config, sort_keys=True).encode())
+
+
+def encode_game(seed, config_ids, moves, winner, col_count=7, scores=None, nodes=None):
+    """
+    Encode one game as a game record payload.
+
+    Parameters:
+        seed (int): The seed the game was played with, or None.
+        config_ids (tuple): The config ids of player 1 and player 2.
+        moves (list): The columns played, in order.
+        winner (int): The winning piece, or None for a draw.
+        col_count (int): The number of columns of the board (default is 7).
+        scores (list): The root score of every move, None for moves without a search (default is no scores).
+        nodes (list): The evaluated nodes of every move (default is no node counts).
+
+    Returns:
+        bytes: The payload.
+    """
+    bits = move_bits(col_count)
+    packed = 0
+    for index, col in enumerate(moves):  # Pack the moves bits-per-move at a time, first move in the lowest bits
+        packed |= col << (index * bits)
+    flags = (HAS_SCORES if scores is not None else 0) | (HAS_NODES if nodes is not None else 0)
+    payload = GAME_HEADER.pack(NO_SEED if seed is None else seed, config_ids[0], config_ids[1], winner or 0, flags, len(moves))
+    payload += packed.to_bytes((len(moves) * bits + 7) // 8, 'little')
+    if scores is not None:
+        payload += struct.pack(f'<{len(moves)}f', *(math.nan if score is None else score for score in scores))
+    if nodes is not None:
+        payload += struct.pack(f'<{len(moves)}I', *(count or 0 for count in nodes))
+    return payload
+
+
+def decode_game(payload, col_count=7):
+    """Decode a game record payload into a dict; the players are config ids."""
+    seed, player1, player2, winner, flags, move_count = GAME_HEADER.unpack_from(payload, 0)
+    bits = move_bits(col_count)
+    offset = GAME_HEADER.size
+    size = (move_count * bits + 7) // 8
+    packed = int.from_bytes(payload[offset:offset + size], 'little')
+    offset += size
+    mask = (1 << bits) - 1
+    record = {'seed': None if seed == NO_SEED else seed, 'player1': player1, 'player2': player2,
+              'winner': winner or None, 'moves': [(packed >> (index * bits)) & mask for index in range(move_count)],
+              'scores': None, 'nodes': None}
+    if flags & HAS_SCORES:
+        scores = struct.unpack_from(f'<{move_count}f', payload, offset)
+        record['scores'] = [None if math.isnan(score) else score for score in scores]
+        offset += 4 * move_count
+    if flags & HAS_NODES:
+        record['nodes'] = list(struct.unpack_from(f'<{move_count}I', payload, offset))
+    return record
+
+
+class GameRecorder:
+    """Class collecting one game's record in memory as the game loop plays it."""
+
+    def __init__(self, col_count=7, scores=True, nodes=True):
+        """Initialize the recorder; scores and nodes choose the optional per-move data."""
+        self.col_count = col_count  # Number of columns in the game board
+        self.keep_scores = scores  # Whether the score of every move is recorded
+        self.keep_nodes = nodes  # Whether the evaluated nodes of every move are recorded
+        self.configs = None  # Configurations of player 1 and player 2
+        self.seed = None
+        self.moves, self.scores, self.nodes = [], [], []
+        self.payload = None  # Encoded record of the finished game
+
+    def begin_game(self, seed, configs):
+        """Start recording a game between the two player configurations."""
+        self.seed, self.configs = seed, configs
+        self.moves, self.scores, self.nodes = [], [], []
+        self.payload = None
+
+    def add_move(self, col, score=None, nodes=None):
+        """Record a move and, optionally, its search score and evaluated nodes."""
+        self.moves.append(col)
+        self.scores.append(score)
+        self.nodes.append(nodes)
+
+    def end_game(self, winner):
+        """Finish the game and encode its record."""
+        self.payload = encode_game(self.seed, [config_id(config) for config in self.configs], self.moves, winner,
+                                   self.col_count, self.scores if self.keep_scores else None,
+                                   self.nodes if self.keep_nodes else None)
+
+
+class GameRecordWriter(GameRecorder):
+    """Class appending game records to a file as games finish.
+
+    The file starts with a small header, followed by length-prefixed
+    records. A player configuration is written once, as JSON, the first
+    time this writer sees it. Each game then refers to its two players by
+    32-bit config ids and packs every move into a few bits.
+    """
+
+    def __init__(self, path, row_count=6, col_count=7, scores=True, nodes=True, win_length=4):
+        """Open the file for appending, writing the file header if the file is new."""
+        GameRecorder.__init__(self, col_count, scores, nodes)
+        self.file = open(path, 'ab')
+        if self.file.tell() == 0:
+            self.file.write(FILE_HEADER.pack(MAGIC, VERSION, row_count, col_count, win_length))
+        else:
+            with open(path, 'rb') as existing:
+                magic, version, rows, cols, length = FILE_HEADER.unpack(existing.read(FILE_HEADER.size))
+            if magic != MAGIC or version != VERSION or (rows, cols, length) != (row_count, col_count, win_length):
+                raise ValueError(f"{path} is not a version {VERSION} {row_count}x{col_count} connect {win_length} game record file")
+        self.written_configs = {}  # JSON of the configurations written by this writer, by config id
+
+    def write_record(self, configs, payload):
+        """Append an encoded game, first writing any configuration the file does not have yet."""
+        for config in configs:
+            text = json.dumps(config, sort_keys=True)
+            identifier = config_id(config)
+            if self.written_configs.get(identifier) != text:
+                if identifier in self.written_configs:
+                    raise ValueError(f"config id {identifier} is shared by two configurations")
+                self.file.write(RECORD_HEADER.pack(CONFIG_RECORD, len(text)) + text.encode())
+                self.written_configs[identifier] = text
+        self.file.write(RECORD_HEADER.pack(GAME_RECORD, len(payload)) + payload)
+
+    def end_game(self, winner):
+        """Finish the game and append its record to the file."""
+        GameRecorder.end_game(self, winner)
+        self.write_record(self.configs, self.payload)
+
+    def flush(self):
+        """Push the written records to the operating system."""
+        self.file.flush()
+
+    def close(self):
+        """Close the file."""
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_games(path):
+    """
+    Iterate over the games of a record file without loading it into memory.
+
+    Parameters:
+        path (str): The record file.
+
+    Yields:
+        dict: The seed, the configurations of player 1 and player 2, the winner, the moves,
+        the per-move scores and node counts (None if they were not recorded), and the board
+        size and win length from the file header.
+    """
+    if os.path.getsize(path) == 0:
+        return
+    with open(path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        magic, version, row_count, col_count, win_length = FILE_HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} game record file")
+        configs = {}
+        offset = FILE_HEADER.size
+        while offset + RECORD_HEADER.size <= len(data):
+            kind, length = RECORD_HEADER.unpack_from(data, offset)
+            offset += RECORD_HEADER.size
+            if offset + length > len(data):  # A record cut short by an interrupted writer
+                break
+            payload = data[offset:offset + length]
+            offset += length
+            if kind == CONFIG_RECORD:
+                config = json.loads(payload)
+                configs[config_id(config)] = config
+            elif kind == GAME_RECORD:
+                record = decode_game(payload, col_count)
+                record['player1'] = configs.get(record['player1'])
+                record['player2'] = configs.get(record['player2'])
+                record['row_count'], record['col_count'], record['win_length'] = row_count, col_count, win_length
+                yield record
+
+
+def replay(record):
+    """Play a record's moves through the game core and return the finished game."""
+    game = Game(record.get('row_count', 6), record.get('col_count', 7), record.get('win_length', 4))
+    for col in record['moves']:
+        if game.play_move(col) is None:
+            raise ValueError(f"move {col} of the record is not legal")
+    return game
+
+
+if __name__ == "__main__":
+    # Usage: python records.py <path> -- print a summary of a record file
+    games = wins = draws = moves_played = 0
+    for game_record in read_games(sys.argv[1]):
+        games += 1
+        moves_played += len(game_record['moves'])
+        draws += game_record['winner'] is None
+        wins += game_record['winner'] == 1
+    print(f"{games} games, {moves_played} moves, player 1 won {wins}, {draws} draws")
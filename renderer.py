@@ -0,0 +1,77 @@
+import pygame
+
+
+class BoardRenderer:
+    """Class drawing the board from surfaces rendered once, updating only the screen regions that changed.
+
+    The empty board and every piece sprite are rendered when the renderer is
+    created. Each redraw blits the cells whose piece differs from what is on
+    screen, plus the hover strip when the hovering piece moved, and passes
+    just those rectangles to ``pygame.display.update``.
+    """
+
+    def __init__(self, screen, row_count, col_count, squaresize, radius, background, board_color, colors):
+        """Render the board and piece surfaces for the screen."""
+        self.screen = screen
+        self.row_count = row_count  # Number of rows in the game board
+        self.col_count = col_count  # Number of columns in the game board
+        self.squaresize = squaresize  # Size of each square on the game board
+        self.background = background  # Color of the hover strip and the empty holes
+        center = (squaresize // 2, squaresize // 2)
+        self.cell_sprites = {}  # One grid square with its piece for each cell value
+        for piece, color in enumerate((background,) + tuple(colors)):
+            sprite = pygame.Surface((squaresize, squaresize))
+            sprite.fill(board_color)
+            pygame.draw.circle(sprite, color, center, radius)
+            self.cell_sprites[piece] = sprite.convert()
+        self.hover_sprites = {}  # Piece shown in the hover strip for each player
+        for piece, color in enumerate(colors, 1):
+            sprite = pygame.Surface((squaresize, squaresize))
+            sprite.fill(background)
+            pygame.draw.circle(sprite, color, center, radius)
+            self.hover_sprites[piece] = sprite.convert()
+        self.strip = pygame.Rect(0, 0, col_count * squaresize, squaresize)  # Hover strip above the board
+        self.shown = None  # Cell values currently on screen, None until the first full draw
+        self.hover = None  # (column, piece) currently shown in the hover strip
+        self.dirty = []  # Screen rectangles changed since the last flush
+
+    def cell_rect(self, row, col):
+        """Return the screen rectangle of the cell."""
+        return pygame.Rect(col * self.squaresize, (row + 1) * self.squaresize, self.squaresize, self.squaresize)
+
+    def draw_board(self, board):
+        """Blit the cells that changed since the last draw, or the whole board the first time."""
+        if self.shown is None:  # Nothing on screen yet
+            self.shown = [[None] * self.col_count for _ in range(self.row_count)]
+            self.screen.fill(self.background, self.strip)
+            self.dirty.append(self.screen.get_rect())
+        for row in range(self.row_count):
+            shown_row, board_row = self.shown[row], board[row]
+            for col in range(self.col_count):
+                if shown_row[col] != board_row[col]:
+                    rect = self.cell_rect(row, col)
+                    self.screen.blit(self.cell_sprites[board_row[col]], rect)
+                    shown_row[col] = board_row[col]
+                    self.dirty.append(rect)
+
+    def draw_hover(self, col, piece):
+        """Show the piece hovering over the column, if it moved."""
+        if self.hover == (col, piece):
+            return
+        self.screen.fill(self.background, self.strip)
+        self.screen.blit(self.hover_sprites[piece], (col * self.squaresize, 0))
+        self.hover = (col, piece)
+        self.dirty.append(self.strip)
+
+    def draw_label(self, label, position):
+        """Replace the hover strip with a rendered text label."""
+        self.screen.fill(self.background, self.strip)
+        self.screen.blit(label, position)
+        self.hover = None
+        self.dirty.append(self.strip)
+
+    def flush(self):
+        """Push the changed rectangles to the display."""
+        if self.dirty:
+            pygame.display.update(self.dirty)
+            self.dirty = []
@@ -0,0 +1,365 @@
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from bitboard import Position
+from book import canonical_key
+
+_players = {}  # AI players of the current worker process, keyed by (piece, search)
+
+
+def init_worker(row_count, col_count):
+    """Create and warm up the worker process's AI players so the first request pays no startup cost."""
+    from ai import AIPlayer  # Only worker processes search
+    for search in ('minimax', 'pvs'):
+        for piece in (1, 2):
+            player = AIPlayer(row_count, col_count, piece, 'Hard', True, 1, search=search, tactics=False)  # Forced moves are searched too, so every answer has a score
+            player.select_move([[0] * col_count for _ in range(row_count)], None, None)  # Fill the window and key caches
+            _players[(piece, search)] = player
+
+
+def analyze_position(task):
+    """Search one position and return its best move and score for the side to move."""
+    board, depth, time_limit_ms, search = task
+    position = Position.from_board(board)
+    piece = 1 if bin(position.bitboards[0]).count('1') == bin(position.bitboards[1]).count('1') else 2
+    player = _players[(piece, search)]
+    player.depth, player.time_limit_ms = depth, time_limit_ms
+    for table in (player.transposition_table, player.solver.table if player.solver is not None else None):
+        if table is not None:
+            table.clear()  # Same result as a fresh player, so cached answers do not depend on history
+    player.killer_moves = []
+    for history in player.history:  # Move ordering must not depend on earlier requests either
+        history[:] = [0] * len(history)
+    random.seed(0)
+    output = player.select_move(board, None, None)
+    return {'move': output[0], 'score': player.scores[-1], 'nodes': output[1][0], 'depth_reached': output[4][0],
+            'search_time': output[2][0]}
+
+
+def analyze_batch(tasks):
+    """Search a batch of positions; this runs inside a worker process."""
+    return [analyze_position(task) for task in tasks]
+
+
+def encode_score(score):
+    """Return the score as a JSON value; infinite scores of old opening books become 'inf' and '-inf'."""
+    if score == float('inf'):
+        return 'inf'
+    if score == float('-inf'):
+        return '-inf'
+    return score
+
+
+class AnalysisServer:
+    """Class serving best-move and score requests over local HTTP.
+
+    Requests are queued and sent to a pool of worker processes in small
+    batches. Results are kept in an LRU cache keyed by the position's
+    mirror-normalized key and the search settings, and requests for a
+    position already being searched wait for that search instead of
+    starting another one.
+    """
+
+    def __init__(self, host='127.0.0.1', port=8765, workers=None, row_count=6, col_count=7, cache_size=100000,
+                 batch_size=8, batch_window_ms=1.0, max_depth=12, default_depth=7):
+        """Configure the server; the worker processes start in serve."""
+        self.host, self.port = host, port
+        self.workers = workers  # Number of worker processes (default is one per core)
+        self.row_count, self.col_count = row_count, col_count
+        self.cache = OrderedDict()  # LRU cache of results, keyed by canonical position and search settings
+        self.cache_size = cache_size  # Maximum number of cached results
+        self.batch_size = batch_size  # Maximum number of positions sent to a worker at once
+        self.batch_window = batch_window_ms / 1000  # Seconds the dispatcher waits to fill a batch
+        self.max_depth = max_depth  # Deepest search a request may ask for
+        self.default_depth = default_depth  # Depth of requests that give neither a depth nor a time limit
+        self.pending = {}  # Futures of the positions being searched, keyed like the cache
+        self.queue = None  # Requests waiting for a worker
+        self.executor = None
+        self.stats = {'requests': 0, 'cache_hits': 0, 'merged': 0, 'searches': 0, 'batches': 0, 'errors': 0}
+
+    def parse_position(self, request):
+        """Return the position described by a request's 'moves' string or 'board' array."""
+        if 'board' in request:
+            board = request['board']
+            if len(board) != self.row_count or any(len(row) != self.col_count for row in board):
+                raise ValueError(f"the board must have {self.row_count} rows of {self.col_count} cells")
+            if any(type(cell) is not int or cell not in (0, 1, 2) for row in board for cell in row):
+                raise ValueError("board cells must be 0 (empty), 1 or 2")
+            position = Position.from_board(board)
+            if position.to_board() != board:
+                raise ValueError("the board has floating pieces or unknown values")
+            difference = bin(position.bitboards[0]).count('1') - bin(position.bitboards[1]).count('1')
+            if difference not in (0, 1):
+                raise ValueError("the board does not have a legal piece count")
+            return position
+        position = Position(self.row_count, self.col_count)
+        for ply, char in enumerate(str(request.get('moves', ''))):
+            if not char.isdigit() or int(char) >= self.col_count or not position.can_play(int(char)):
+                raise ValueError(f"illegal move {char!r} at ply {ply}")
+            position.make_move(int(char), ply % 2 + 1)
+        return position
+
+    def parse_limits(self, request):
+        """Return the (depth, time limit, search) of a request."""
+        time_limit_ms = request.get('time_limit_ms')
+        depth = int(request.get('depth', self.max_depth if time_limit_ms else self.default_depth))
+        if not 1 <= depth <= self.max_depth:
+            raise ValueError(f"depth must be between 1 and {self.max_depth}")
+        search = request.get('search', 'pvs')
+        if search not in ('minimax', 'pvs'):
+            raise ValueError("search must be 'minimax' or 'pvs'")
+        return depth, (float(time_limit_ms) if time_limit_ms else None), search
+
+    async def analyze(self, request):
+        """Answer one analysis request, from the cache when possible."""
+        self.stats['requests'] += 1
+        position = self.parse_position(request)
+        if position.has_won(1) or position.has_won(2) or position.is_full():
+            raise ValueError("the game is already over")
+        depth, time_limit_ms, search = self.parse_limits(request)
+        key, mirrored = canonical_key(position)
+        cache_key = (key, depth, time_limit_ms, search)
+        result = self.cache.get(cache_key)
+        if result is not None:
+            self.stats['cache_hits'] += 1
+            self.cache.move_to_end(cache_key)
+            cached = True
+        else:
+            cached = False
+            future = self.pending.get(cache_key)
+            if future is not None:  # The same position is already being searched
+                self.stats['merged'] += 1
+            else:
+                future = asyncio.get_running_loop().create_future()
+                self.pending[cache_key] = future
+                board = position.to_board()
+                if mirrored:  # Search the canonical orientation, so cached moves are stored one way
+                    board = [row[::-1] for row in board]
+                await self.queue.put(((board, depth, time_limit_ms, search), cache_key, future))
+            result = await asyncio.shield(future)
+        move = result['move']
+        return dict(result, move=self.col_count - 1 - move if mirrored else move, score=encode_score(result['score']),
+                    cached=cached)
+
+    def store(self, cache_key, result):
+        """Add a result to the LRU cache, evicting the least recently used results."""
+        self.cache[cache_key] = result
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+    async def dispatch(self):
+        """
+        Collect queued requests into batches and run them on the worker pool.
+
+        A worker searches its batch one position after another, so only fixed-depth requests
+        share a batch. A time-limited request is sent on its own, so it never waits for
+        other searches of its batch and keeps its time limit.
+        """
+        loop = asyncio.get_running_loop()
+        slots = asyncio.Semaphore(self.workers)  # Batches in flight, one per worker
+        while True:
+            request = await self.queue.get()
+            batches = [[request]]
+            deadline = loop.time() + self.batch_window
+            while request[0][2] is None and len(batches[0]) < self.batch_size:  # Wait briefly for more requests to share the round trip
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    queued = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if queued[0][2] is not None:  # Time-limited requests are searched alone
+                    batches.append([queued])
+                    break
+                batches[0].append(queued)
+            for batch in batches:
+                await slots.acquire()
+                loop.create_task(self.run_batch(batch, slots))
+
+    async def run_batch(self, batch, slots):
+        """Search a batch on a worker and resolve the futures of its requests."""
+        self.stats['batches'] += 1
+        self.stats['searches'] += len(batch)
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(self.executor, analyze_batch,
+                                                                       [task for task, _, _ in batch])
+        except Exception as error:  # Report the failure to every waiting request
+            for _, cache_key, future in batch:
+                self.pending.pop(cache_key, None)
+                future.set_exception(error)
+        else:
+            for (_, cache_key, future), result in zip(batch, results):
+                self.store(cache_key, result)
+                self.pending.pop(cache_key, None)
+                future.set_result(result)
+        finally:
+            slots.release()
+
+    async def respond(self, writer, status, body):
+        """Write a JSON HTTP response."""
+        data = json.dumps(body).encode()
+        reason = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 500: 'Internal Server Error'}[status]
+        writer.write(f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json\r\n"
+                     f"Content-Length: {len(data)}\r\n\r\n".encode() + data)
+        await writer.drain()
+
+    async def handle(self, reader, writer):
+        """Serve the HTTP requests of one keep-alive connection."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, path, _ = request_line.decode().split(' ', 2)
+                    headers = {}
+                    while True:
+                        line = await reader.readline()
+                        if line in (b'\r\n', b'\n', b''):
+                            break
+                        name, _, value = line.decode().partition(':')
+                        headers[name.strip().lower()] = value.strip()
+                    length = int(headers.get('content-length', 0))
+                    if length < 0:
+                        raise ValueError("negative content length")
+                except ValueError as error:  # Malformed request line or headers
+                    self.stats['errors'] += 1
+                    await self.respond(writer, 400, {'error': f"malformed request: {error}"})
+                    break  # The rest of the stream cannot be parsed reliably
+                body = await reader.readexactly(length)
+                if method == 'POST' and path == '/analyze':
+                    try:
+                        await self.respond(writer, 200, await self.analyze(json.loads(body or b'{}')))
+                    except (ValueError, TypeError, KeyError) as error:
+                        self.stats['errors'] += 1
+                        await self.respond(writer, 400, {'error': str(error)})
+                    except Exception as error:
+                        self.stats['errors'] += 1
+                        await self.respond(writer, 500, {'error': repr(error)})
+                elif method == 'GET' and path == '/stats':
+                    await self.respond(writer, 200, dict(self.stats, cached_positions=len(self.cache)))
+                else:
+                    await self.respond(writer, 404, {'error': f"no route for {method} {path}"})
+                if headers.get('connection', '').lower() == 'close':
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass  # The client went away
+        finally:
+            writer.close()
+
+    async def serve(self, ready=None):
+        """Start the worker pool and serve requests until cancelled."""
+        self.queue = asyncio.Queue()
+        self.workers = self.workers or os.cpu_count()
+        self.executor = ProcessPoolExecutor(self.workers, initializer=init_worker, initargs=(self.row_count, self.col_count))
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*[loop.run_in_executor(self.executor, time.sleep, 0.1) for _ in range(self.workers)])  # Start every worker now
+        dispatcher = loop.create_task(self.dispatch())
+        server = await asyncio.start_server(self.handle, self.host, self.port)
+        if ready is not None:
+            ready.set()
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            dispatcher.cancel()
+            self.executor.shutdown(cancel_futures=True)
+
+
+async def post(reader, writer, path, body):
+    """Send one request on a keep-alive connection and return the status and decoded JSON response."""
+    data = json.dumps(body).encode()
+    writer.write(f"POST {path} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+                 f"Content-Length: {len(data)}\r\n\r\n".encode() + data)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode().partition(':')
+        if name.lower() == 'content-length':
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+
+def random_openings(count, max_plies=10, row_count=6, col_count=7, seed=0):
+    """Return distinct random move strings that do not end the game, to use as load-test positions."""
+    rng = random.Random(seed)
+    openings = set()
+    while len(openings) < count:
+        position = Position(row_count, col_count)
+        moves = ''
+        for ply in range(rng.randint(0, max_plies)):
+            col = rng.choice(position.valid_moves())
+            position.make_move(col, ply % 2 + 1)
+            if position.has_won(ply % 2 + 1):
+                break
+            moves += str(col)
+        openings.add(moves)
+    return sorted(openings)
+
+
+async def load_test(host='127.0.0.1', port=8765, requests=1000, concurrency=16, positions=200, depth=5, seed=0):
+    """
+    Send analysis requests from concurrent clients and measure the server's latency and throughput.
+
+    Parameters:
+        host (str): The server's host (default is 127.0.0.1).
+        port (int): The server's port (default is 8765).
+        requests (int): The total number of requests (default is 1000).
+        concurrency (int): The number of clients sending requests at the same time (default is 16).
+        positions (int): The number of distinct positions the requests are drawn from (default is 200).
+        depth (int): The search depth of every request (default is 5).
+        seed (int): The seed of the positions and of the request order (default is 0).
+
+    Returns:
+        dict: The p50 and p99 latency in milliseconds, the requests per second and the error count.
+    """
+    openings = random_openings(positions, seed=seed)
+    rng = random.Random(seed)
+    order = [rng.choice(openings) for _ in range(requests)]
+    latencies, errors = [], 0
+
+    async def client(moves_list):
+        nonlocal errors
+        reader, writer = await asyncio.open_connection(host, port)
+        for moves in moves_list:
+            start_time = time.perf_counter()
+            status, _ = await post(reader, writer, '/analyze', {'moves': moves, 'depth': depth})
+            latencies.append(time.perf_counter() - start_time)
+            errors += status != 200
+        writer.close()
+
+    start_time = time.perf_counter()
+    await asyncio.gather(*[client(order[index::concurrency]) for index in range(concurrency)])
+    wall_time = time.perf_counter() - start_time
+    latencies.sort()
+    report = {'requests': requests, 'errors': errors,
+              'p50_ms': 1000 * latencies[len(latencies) // 2],
+              'p99_ms': 1000 * latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+              'requests_per_second': requests / wall_time}
+    print(f"{requests} requests from {concurrency} clients: p50 {round(report['p50_ms'], 2)} ms, "
+          f"p99 {round(report['p99_ms'], 2)} ms, {round(report['requests_per_second'], 1)} requests/second, {errors} errors")
+    return report
+
+
+if __name__ == "__main__":
+    # Usage: python server.py serve [port] [workers]
+    #        python server.py loadtest [port] [requests] [concurrency]
+    command = sys.argv[1] if len(sys.argv) > 1 else 'serve'
+    server_port = int(sys.argv[2]) if len(sys.argv) > 2 else 8765
+    if command == 'serve':
+        asyncio.run(AnalysisServer(port=server_port, workers=int(sys.argv[3]) if len(sys.argv) > 3 else None).serve())
+    elif command == 'loadtest':
+        asyncio.run(load_test(port=server_port, requests=int(sys.argv[3]) if len(sys.argv) > 3 else 1000,
+                              concurrency=int(sys.argv[4]) if len(sys.argv) > 4 else 16))
+    else:
+        sys.exit(f"Unknown command {command}; use 'serve' or 'loadtest'")
@@ -0,0 +1,126 @@
+import time
+from transposition import TranspositionTable, EXACT, LOWER, UPPER
+
+
+class SolverTimeout(Exception):
+    """Raised inside the solver when its deadline passes or its stop flag is set."""
+
+
+class EndgameSolver:
+    """Class solving positions exactly, to the end of the game.
+
+    Scores are from the point of view of the player to move and depend on the
+    ply at which the game ends: a win on ply P scores ``cells + 1 - P``, the
+    matching loss scores the negative of that and a draw scores 0. Quicker
+    wins and slower losses therefore score higher, and a score does not depend
+    on the path to the position, so proven results are cached for the rest of
+    the game.
+    """
+
+    def __init__(self, row_count=6, col_count=7, memory_mb=16):
+        """Initialize the solver and its cache of proven results."""
+        self.row_count = row_count  # Number of rows in the game board
+        self.col_count = col_count  # Number of columns in the game board
+        self.cells = row_count * col_count  # Number of plies in a full game
+        self.center_order = sorted(range(col_count), key=lambda col: abs(col - col_count // 2))  # Columns from the center outwards
+        self.table = TranspositionTable(memory_mb)  # Proven scores and bounds, kept across moves
+        self.nodes = 0  # Number of nodes searched by the last solve
+        self.deadline = None  # perf_counter time at which the running solve must stop, or None
+        self.stop_flag = None  # Object whose value is set to stop the running solve, or None
+
+    def negamax(self, position, piece, alpha, beta, plies):
+        """Return the exact score of the position for the piece to move, or a bound outside (alpha, beta)."""
+        self.nodes += 1
+        if not self.nodes & 1023 and self.solve_stopped():  # Check the clock and the stop flag every 1024 nodes
+            raise SolverTimeout()
+        if plies == self.cells:  # If the board is full
+            return 0
+        for col in self.center_order:  # Win at once if possible
+            if position.can_play(col) and position.is_winning_move(col, piece):
+                return self.cells - plies
+        max_score = max(0, self.cells - plies - 2)  # The earliest possible win is now on the move after next
+        if beta > max_score:
+            beta = max_score
+            if alpha >= beta:
+                return beta
+
+        entry = self.table.probe(position.key)
+        if entry is not None:
+            _, _, entry_score, entry_flag, _ = entry
+            if entry_flag == EXACT:
+                return entry_score
+            if entry_flag == LOWER:
+                alpha = max(alpha, entry_score)
+            else:
+                beta = min(beta, entry_score)
+            if alpha >= beta:
+                return entry_score
+        alpha_start = alpha
+
+        opponent = 3 - piece
+        best_score, best_move = float('-inf'), None
+        for col in self.center_order:
+            if not position.can_play(col):
+                continue
+            position.make_move(col, piece)
+            score = -self.negamax(position, opponent, -beta, -alpha, plies + 1)
+            position.unmake_move()
+            if score > best_score:
+                best_score, best_move = score, col
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+
+        flag = EXACT
+        if best_score <= alpha_start:
+            flag = UPPER
+        elif best_score >= beta:
+            flag = LOWER
+        self.table.store(position.key, 0, best_score, flag, best_move)
+        return best_score
+
+    def solve_stopped(self):
+        """Check if the deadline of the running solve has passed or its stop flag is set."""
+        if self.deadline is not None and time.perf_counter() >= self.deadline:
+            return True
+        return self.stop_flag is not None and bool(self.stop_flag.value)
+
+    def solve(self, position, piece, deadline=None, stop_flag=None):
+        """
+        Return the best move and exact score of the position for the piece to move.
+
+        Raises SolverTimeout once the deadline passes or the stop flag is set. The position
+        is then left with the moves of the interrupted line still made, and the cache only
+        holds results of subtrees that were searched to the end.
+        """
+        self.nodes = 0
+        self.deadline, self.stop_flag = deadline, stop_flag
+        entry = self.table.probe(position.key)
+        if entry is not None and entry[3] == EXACT and entry[4] is not None:  # Proven earlier in the game
+            return entry[4], entry[2]
+        plies = position.piece_count()
+        for col in self.center_order:
+            if position.can_play(col) and position.is_winning_move(col, piece):
+                return col, self.cells - plies
+        alpha, beta = -self.cells, self.cells
+        best_score, best_move = float('-inf'), None
+        for col in self.center_order:
+            if not position.can_play(col):
+                continue
+            position.make_move(col, piece)
+            score = -self.negamax(position, 3 - piece, -beta, -alpha, plies + 1)
+            position.unmake_move()
+            if score > best_score:
+                best_score, best_move = score, col
+                alpha = max(alpha, score)
+        self.table.store(position.key, 0, best_score, EXACT, best_move)
+        return best_move, best_score
+
+    def outcome(self, score, plies):
+        """Return 'win', 'loss' or 'draw' for the player to move, and the number of plies left in the game."""
+        if score > 0:
+            return 'win', self.cells + 1 - score - plies
+        if score < 0:
+            return 'loss', self.cells + 1 + score - plies
+        return 'draw', self.cells - plies
@@ -0,0 +1,169 @@
+import csv
+import json
+import platform
+import random
+import sys
+import time
+from ai import AIPlayer
+from benchmark import opening_position
+from tournament import make_config
+
+# Fixed corpus of positions, each given as the columns played from the empty board
+POSITIONS = {
+    'opening-empty': '',
+    'opening-center': '33',
+    'opening-4ply': '3342',
+    'opening-6ply': '332422',
+    'middlegame-13ply': '3332122122335',
+    'middlegame-14ply': '53133630105133',
+    'middlegame-16ply': '1333116131162355',
+    'endgame-24ply-a': '531336301051335551154660',
+    'endgame-24ply-b': '133311613116235535555202',
+}
+
+# Engine configurations measured on every position, each at a fixed depth; tactics are off so forced positions are still searched
+CONFIGS = [
+    make_config('minimax-d7', depth=7, tactics=False),
+    make_config('minimax-d7-no-tt', depth=7, tt_memory_mb=0, tactics=False),
+    make_config('pvs-d9', depth=9, search='pvs', tactics=False),
+]
+
+FIELDS = ('config', 'position', 'depth', 'move', 'nodes', 'time', 'nodes_per_second')
+
+
+def run_position(config, name, opening, seed=0, repeats=3):
+    """
+    Search one corpus position with one configuration.
+
+    Parameters:
+        config (dict): The configuration created with make_config.
+        name (str): The name of the position.
+        opening (str): The columns played from the empty board.
+        seed (int): The seed of the AI player's random choices (default is 0).
+        repeats (int): The number of timed searches; the fastest one is kept (default is 3).
+
+    Returns:
+        dict: The chosen move, evaluated nodes, wall time and nodes per second.
+    """
+    position, col_num, row_num, ai_piece = opening_position(tuple(int(col) for col in opening))
+    board = position.to_board()
+    options = {key: value for key, value in config.items() if key not in ('name', 'difficulty', 'depth', 'pruning')}
+    best_time, move, nodes = float('inf'), None, 0
+    for _ in range(repeats):
+        random.seed(seed)  # Same tie-breaks on every run
+        player = AIPlayer(position.row_count, position.col_count, ai_piece, config['difficulty'], config['pruning'],
+                          config['depth'], **options)  # Fresh player, so no results are reused between runs
+        start_time = time.perf_counter()
+        output = player.select_move(board, col_num, row_num)
+        elapsed = time.perf_counter() - start_time
+        player.close()
+        move, nodes = output[0], output[1][0]
+        best_time = min(best_time, elapsed)
+    return {'config': config['name'], 'position': name, 'depth': config['depth'], 'move': move, 'nodes': nodes,
+            'time': best_time, 'nodes_per_second': nodes / best_time if best_time else 0.0}
+
+
+def run_suite(configs=CONFIGS, positions=POSITIONS, seed=0, repeats=3, verbose=True):
+    """
+    Run every configuration on every corpus position.
+
+    Parameters:
+        configs (list): The configurations created with make_config (default is CONFIGS).
+        positions (dict): The corpus, mapping position names to opening columns (default is POSITIONS).
+        seed (int): The seed of the AI players' random choices (default is 0).
+        repeats (int): The number of timed searches per position; the fastest one is kept (default is 3).
+        verbose (bool): A flag indicating whether each result should be printed (default is True).
+
+    Returns:
+        dict: The run's settings and one result per (configuration, position) pair.
+    """
+    results = []
+    for config in configs:
+        for name, opening in positions.items():
+            result = run_position(config, name, opening, seed, repeats)
+            results.append(result)
+            if verbose:
+                print(f"{result['config']:>18} {result['position']:<18} move {result['move']}, {result['nodes']} nodes, "
+                      f"{round(result['time'], 4)} seconds, {round(result['nodes_per_second'])} nodes/second")
+    return {'seed': seed, 'repeats': repeats, 'python': platform.python_version(), 'machine': platform.machine(),
+            'results': results}
+
+
+def write_json(run, path):
+    """Write a suite run to a JSON file."""
+    with open(path, 'w') as file:
+        json.dump(run, file, indent=2)
+
+
+def write_csv(run, path):
+    """Write the results of a suite run to a CSV file, one row per (configuration, position) pair."""
+    with open(path, 'w', newline='') as file:
+        writer = csv.DictWriter(file, fieldnames=FIELDS)
+        writer.writeheader()
+        for result in run['results']:
+            writer.writerow({field: result[field] for field in FIELDS})
+
+
+def load_run(path):
+    """Read a suite run written by write_json."""
+    with open(path) as file:
+        return json.load(file)
+
+
+def compare_runs(run, baseline, node_tolerance=0.0, speed_tolerance=0.15):
+    """
+    Compare a suite run with a saved baseline run.
+
+    Node counts are deterministic, so any growth beyond node_tolerance is a
+    search regression. Speed is noisy, so nodes per second are compared per
+    configuration over the whole corpus.
+
+    Parameters:
+        run (dict): The new run.
+        baseline (dict): The baseline run.
+        node_tolerance (float): The allowed relative growth of a position's node count (default is 0).
+        speed_tolerance (float): The allowed relative drop of a configuration's nodes per second (default is 0.15).
+
+    Returns:
+        list: A description of every regression found (empty if there are none).
+    """
+    baseline_results = {(result['config'], result['position']): result for result in baseline['results']}
+    regressions = []
+    totals = {}
+    for result in run['results']:
+        old = baseline_results.get((result['config'], result['position']))
+        if old is None or old['depth'] != result['depth']:
+            continue  # Not measured the same way in the baseline
+        if result['nodes'] > old['nodes'] * (1 + node_tolerance):
+            regressions.append(f"{result['config']} on {result['position']}: {old['nodes']} -> {result['nodes']} nodes")
+        if result['move'] != old['move']:
+            print(f"Note: {result['config']} on {result['position']} now plays {result['move']} instead of {old['move']}")
+        nodes, seconds, old_nodes, old_seconds = totals.get(result['config'], (0, 0.0, 0, 0.0))
+        totals[result['config']] = (nodes + result['nodes'], seconds + result['time'],
+                                    old_nodes + old['nodes'], old_seconds + old['time'])
+    for name, (nodes, seconds, old_nodes, old_seconds) in totals.items():
+        speed, old_speed = nodes / seconds if seconds else 0.0, old_nodes / old_seconds if old_seconds else 0.0
+        if speed < old_speed * (1 - speed_tolerance):
+            regressions.append(f"{name}: {round(old_speed)} -> {round(speed)} nodes/second")
+    return regressions
+
+
+if __name__ == "__main__":
+    # Usage: python suite.py run <results.json> [results.csv]
+    #        python suite.py compare <baseline.json> [results.json]
+    command = sys.argv[1] if len(sys.argv) > 1 else 'run'
+    if command == 'run':
+        suite_run = run_suite()
+        write_json(suite_run, sys.argv[2] if len(sys.argv) > 2 else 'suite.json')
+        if len(sys.argv) > 3:
+            write_csv(suite_run, sys.argv[3])
+    elif command == 'compare':
+        baseline_run = load_run(sys.argv[2])
+        suite_run = load_run(sys.argv[3]) if len(sys.argv) > 3 else run_suite()
+        found = compare_runs(suite_run, baseline_run)
+        for regression in found:
+            print(f"Regression: {regression}")
+        print(f"{len(found)} regressions against {sys.argv[2]}")
+        sys.exit(1 if found else 0)
+    else:
+        sys.exit(f"Unknown command {command}; use 'run' or 'compare'")
@@ -0,0 +1,20 @@
+import random
+from bitboard import Position
+
+
+def random_positions(seed, count, max_plies, row_count=6, col_count=7):
+    """Return (board, piece to move, last column, last row) of random unfinished positions."""
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < count:
+        position = Position(row_count, col_count)
+        piece, last = 1, (None, None)
+        for _ in range(rng.randint(0, max_plies)):
+            col = rng.choice(position.valid_moves())
+            last = col, position.make_move(col, piece)
+            if position.has_won(piece):
+                break
+            piece = 3 - piece
+        if not position.has_won(piece) and not position.is_full():
+            positions.append((position.to_board(), piece) + last)
+    return positions
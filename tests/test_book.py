@@ -0,0 +1,46 @@
+import pytest
+from ai import AIPlayer
+from bitboard import Position
+from book import OpeningBook, book_positions, build_book
+
+DEPTH = 5  # Search depth of the test book
+
+
+@pytest.fixture(scope='module')
+def book(tmp_path_factory):
+    """Build a small opening book of the first 4 plies and map it."""
+    path = tmp_path_factory.mktemp('book') / 'test.book'
+    build_book(str(path), plies=4, depth=DEPTH, workers=2)
+    opening_book = OpeningBook(str(path))
+    yield opening_book
+    opening_book.close()
+
+
+def search_score(board, piece, move=None):
+    """Return a fresh PVS search's root score of the board, or of the given root move only."""
+    player = AIPlayer(len(board), len(board[0]), piece, 'Hard', True, DEPTH, search='pvs')
+    position = Position.from_board(board)
+    player.evaluator.attach(position)
+    if move is None:
+        return player.search_root(position, DEPTH, None, None)[0]
+    row = position.make_move(move, piece)
+    return -player.negamax(position, DEPTH - 1, float('-inf'), float('inf'), 3 - piece, move, row, 1)[0]
+
+
+def test_book_matches_search(book):
+    """Every book position and its mirror image gets the score of a direct search, and a move that achieves it."""
+    for board, piece in book_positions(4):
+        for orientation in (board, [row[::-1] for row in board]):
+            move, score = book.lookup(Position.from_board(orientation))
+            assert score == search_score(orientation, piece), (orientation, piece)
+            assert search_score(orientation, piece, move) == score, (orientation, piece, move)
+
+
+def test_player_plays_book_moves(book):
+    """A player with the book plays the book move without searching."""
+    board = [[0] * 7 for _ in range(6)]
+    player = AIPlayer(6, 7, 1, 'Hard', True, DEPTH, book_path=book.file.name, tactics=False)
+    move, nodes = player.select_move(board, None, None)[:2]
+    assert move == book.lookup(Position.from_board(board))[0]
+    assert nodes == [0] and player.depths_reached == [book.depth]
+    player.close()
@@ -0,0 +1,23 @@
+import random
+import pytest
+from ai import AIPlayer
+from bitboard import Position
+
+
+@pytest.mark.parametrize('row_count, col_count, win_length', [(6, 7, 4), (5, 4, 4), (4, 4, 4), (7, 9, 5), (8, 8, 3)])
+def test_incremental_evaluation_matches_full_evaluation(row_count, col_count, win_length):
+    """The running evaluation equals a full board scan after every move and take-back of random games."""
+    rng = random.Random(f"{row_count}x{col_count}:{win_length}")
+    players = {piece: AIPlayer(row_count, col_count, piece, 'Hard', True, 1, win_length=win_length) for piece in (1, 2)}
+    for _ in range(40):
+        position = Position(row_count, col_count, win_length)
+        players[1].evaluator.attach(position)
+        piece = 1
+        while position.valid_moves():
+            position.make_move(rng.choice(position.valid_moves()), piece)
+            piece = 3 - piece
+            if rng.random() < 0.2:  # Take a move back now and then
+                position.unmake_move()
+                piece = 3 - piece
+            for player in players.values():
+                assert position.evaluator.evaluate(player.ai_piece) == player.evaluate_state(position)
@@ -0,0 +1,25 @@
+import pytest
+from ai import AIPlayer
+from bitboard import Position
+from positions import random_positions
+
+
+def root_score(board, piece, col_num, row_num, depth, search, workers=1, parallel='root'):
+    """Return the root score of a fresh player's search of the board, closing its worker processes."""
+    player = AIPlayer(len(board), len(board[0]), piece, 'Hard', True, depth, search=search, workers=workers, parallel=parallel)
+    position = Position.from_board(board)
+    player.evaluator.attach(position)
+    try:
+        return player.search_root(position, depth, col_num, row_num)[0]
+    finally:
+        player.close()
+
+
+@pytest.mark.parametrize('parallel', ['root', 'lazy'])
+@pytest.mark.parametrize('search', ['minimax', 'pvs'])
+def test_parallel_search_matches_sequential(search, parallel):
+    """Root splitting and Lazy SMP find the same root score as the sequential search."""
+    for index, (board, piece, col_num, row_num) in enumerate(random_positions(11, 8, 20)):
+        depth = index % 4 + 3
+        sequential = root_score(board, piece, col_num, row_num, depth, search)
+        assert root_score(board, piece, col_num, row_num, depth, search, 2, parallel) == sequential, (board, piece, depth)
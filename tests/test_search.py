@@ -0,0 +1,22 @@
+import pytest
+from ai import AIPlayer
+from bitboard import Position
+from positions import random_positions
+
+
+def root_score(board, piece, col_num, row_num, depth, tt_memory_mb, search):
+    """Return the root score of a fresh player's search of the board."""
+    player = AIPlayer(len(board), len(board[0]), piece, 'Hard', True, depth, tt_memory_mb, search=search)
+    position = Position.from_board(board)
+    player.evaluator.attach(position)
+    return player.search_root(position, depth, col_num, row_num)[0]
+
+
+@pytest.mark.parametrize('tt_memory_mb', [16, 0])
+def test_pvs_matches_minimax(tt_memory_mb):
+    """Negamax PVS finds the same root score as alpha-beta minimax at the same depth, with and without the table."""
+    for index, (board, piece, col_num, row_num) in enumerate(random_positions(7, 40, 25)):
+        depth = index % 6 + 1
+        minimax = root_score(board, piece, col_num, row_num, depth, tt_memory_mb, 'minimax')
+        pvs = root_score(board, piece, col_num, row_num, depth, tt_memory_mb, 'pvs')
+        assert pvs == minimax, (board, piece, depth)
@@ -0,0 +1,233 @@
+import math
+import random
+import time
+import warnings
+from itertools import combinations
+from multiprocessing import Pool
+from game import play_game
+from ai import AIPlayer
+from bitboard import Position
+from records import GameRecorder, GameRecordWriter
+
+
+def make_config(name, difficulty='Hard', depth=5, pruning=True, **options):
+    """
+    Describe an AI player configuration taking part in a tournament.
+
+    Parameters:
+        name (str): The unique name of the configuration.
+        difficulty (str): The difficulty level of the AI player ('Easy', 'Medium', or 'Hard').
+        depth (int): The depth of the search (default is 5).
+        pruning (bool): A flag indicating whether alpha-beta pruning should be enabled (default is True).
+        **options: Extra AIPlayer keyword arguments (tt_memory_mb, time_limit_ms, search).
+
+    Returns:
+        dict: The configuration.
+    """
+    return dict(options, name=name, difficulty=difficulty, depth=depth, pruning=pruning)
+
+
+def make_player(config, piece, row_count=6, col_count=7, win_length=4):
+    """Create the AI player described by a configuration."""
+    options = {key: value for key, value in config.items() if key not in ('name', 'difficulty', 'depth', 'pruning')}
+    return AIPlayer(row_count, col_count, piece, config['difficulty'], config['pruning'], config['depth'],
+                    win_length=win_length, **options)
+
+
+def play_tournament_game(task):
+    """
+    Play one seeded tournament game; this runs inside a worker process.
+
+    Parameters:
+        task (tuple): The game number, the configuration moving first, the configuration moving second, the seed,
+        a flag indicating whether the game record should be returned, the board (row count, column count, win length)
+        and the opening columns played before the AI players move.
+
+    Returns:
+        dict: The players, winner, number of moves, the moves played, and the evaluated nodes, search time, number of
+        searched moves and transposition table stats of each player, plus the encoded game record if requested.
+    """
+    game_number, first, second, seed, record, board, opening = task
+    row_count, col_count, win_length = board
+    recorder = GameRecorder(col_count) if record else None
+    configs = [dict(config, row_count=row_count, col_count=col_count, win_length=win_length) for config in (first, second)]
+    game = play_game(make_player(first, 1, *board), make_player(second, 2, *board), seed, row_count, col_count, recorder,
+                     win_length, opening, configs)  # Records name the tournament configurations
+    names = (first['name'], second['name'])
+    return {'game': game_number, 'seed': seed, 'player1': names[0], 'player2': names[1],
+            'winner': names[game.winner - 1] if game.winner else None,
+            'moves': len(game.moves), 'sequence': tuple(game.moves),
+            'nodes': {names[0]: sum(game.nodes_count_aiplayer1), names[1]: sum(game.nodes_count_aiplayer2)},
+            'time': {names[0]: sum(game.execution_times_aiplayer1), names[1]: sum(game.execution_times_aiplayer2)},
+            'searched_moves': {names[0]: len(game.nodes_count_aiplayer1), names[1]: len(game.nodes_count_aiplayer2)},
+            'tt_stats': {names[0]: game.tt_stats_aiplayer1, names[1]: game.tt_stats_aiplayer2},
+            'record': (recorder.configs, recorder.payload) if record else None}
+
+
+def random_opening(rng, plies, board=(6, 7, 4)):
+    """Return random opening columns that neither fill a column nor win, drawn from the random generator."""
+    position = Position(*board)
+    opening = []
+    for ply in range(plies):
+        piece = ply % 2 + 1
+        moves = [col for col in position.valid_moves() if not position.is_winning_move(col, piece)]
+        if not moves:
+            break
+        col = rng.choice(moves)
+        position.make_move(col, piece)
+        opening.append(col)
+    return tuple(opening)
+
+
+def tournament_tasks(configs, games_per_pair, seed=0, record=False, board=(6, 7, 4), opening_plies=4):
+    """
+    Return the games of a round robin between the configurations.
+
+    The search is deterministic at the Hard difficulty, so every game of a pair starts from
+    a seeded random opening of opening_plies moves. Each opening is played twice, with the
+    configurations swapping who moves first.
+    """
+    tasks = []
+    for first, second in combinations(configs, 2):
+        for game in range(games_per_pair):
+            pair = (first, second) if game % 2 == 0 else (second, first)  # Alternate who moves first
+            rng = random.Random(f"{seed}:{first['name']}:{second['name']}:{game // 2}")  # Same opening for both colours
+            opening = random_opening(rng, opening_plies, board)
+            tasks.append((len(tasks), pair[0], pair[1], seed * 1000003 + len(tasks), record, board, opening))
+    return tasks
+
+
+def iter_games(configs, games_per_pair, seed=0, workers=None, record=False, board=(6, 7, 4), opening_plies=4):
+    """Play the tournament on a process pool and yield each game's result as soon as it finishes."""
+    tasks = tournament_tasks(configs, games_per_pair, seed, record, board, opening_plies)
+    with Pool(workers) as pool:
+        for result in pool.imap_unordered(play_tournament_game, tasks):
+            yield result
+
+
+def wilson_interval(successes, trials, z=1.96):
+    """Return the Wilson score confidence interval of a proportion."""
+    if trials == 0:
+        return 0.0, 1.0
+    rate = successes / trials
+    center = (rate + z * z / (2 * trials)) / (1 + z * z / trials)
+    margin = z * math.sqrt(rate * (1 - rate) / trials + z * z / (4 * trials * trials)) / (1 + z * z / trials)
+    return max(0.0, center - margin), min(1.0, center + margin)
+
+
+def elo_difference(score):
+    """Convert an expected score into an Elo rating difference."""
+    if score <= 0:
+        return float('-inf')
+    if score >= 1:
+        return float('inf')
+    return -400 * math.log10(1 / score - 1)
+
+
+def summarize(results, z=1.96):
+    """
+    Compute the head-to-head statistics of a finished tournament.
+
+    Parameters:
+        results (list): The per-game results returned by play_tournament_game.
+        z (float): The normal quantile of the confidence intervals (default is 1.96 for 95%).
+
+    Returns:
+        dict: Win/draw/loss rates with confidence intervals and Elo estimates for every pair,
+        and aggregate nodes per second for every configuration. Seeded openings should make
+        every game distinct, so a game that repeats the moves of an earlier game between the
+        same players raises a RuntimeWarning: the intervals would overstate the number of
+        independent trials.
+    """
+    pairs = {}
+    seen = {}  # (first mover, second mover, moves) -> number of the first game played that way
+    speed = {}
+    for result in sorted(results, key=lambda result: result['game']):
+        for name in (result['player1'], result['player2']):
+            nodes, seconds = speed.get(name, (0, 0.0))
+            speed[name] = (nodes + result['nodes'][name], seconds + result['time'][name])
+        first, second = sorted((result['player1'], result['player2']))
+        game = (result['player1'], result['player2'], result['sequence'])
+        if game in seen:
+            warnings.warn(f"Game {result['game']} repeats the moves of game {seen[game]} "
+                          f"({result['player1']} vs {result['player2']})", RuntimeWarning)
+        seen.setdefault(game, result['game'])
+        pairs.setdefault((first, second), []).append(1.0 if result['winner'] == first else 0.0 if result['winner'] == second else 0.5)  # Score of the first name
+
+    summary = {'pairs': {}, 'nodes_per_second': {}}
+    for (first, second), outcomes in pairs.items():
+        games = len(outcomes)
+        wins, draws = outcomes.count(1.0), outcomes.count(0.5)
+        losses = games - wins - draws
+        score = sum(outcomes) / games
+        deviation = math.sqrt(sum((outcome - score) ** 2 for outcome in outcomes) / games)  # Spread of the per-game scores
+        margin = z * deviation / math.sqrt(games)
+        summary['pairs'][f"{first} vs {second}"] = {
+            'games': games,
+            'win_rate': wins / games, 'win_interval': wilson_interval(wins, games, z),
+            'draw_rate': draws / games, 'draw_interval': wilson_interval(draws, games, z),
+            'loss_rate': losses / games, 'loss_interval': wilson_interval(losses, games, z),
+            'score': score,
+            'elo': elo_difference(score),
+            'elo_interval': (elo_difference(score - margin), elo_difference(score + margin))}
+    for name, (nodes, seconds) in speed.items():
+        summary['nodes_per_second'][name] = nodes / seconds if seconds else 0.0
+    return summary
+
+
+def run_tournament(configs, games_per_pair, seed=0, workers=None, verbose=True, record_path=None, board=(6, 7, 4), opening_plies=4):
+    """
+    Play a round robin tournament between AI configurations on all cores and summarize it.
+
+    Parameters:
+        configs (list): The configurations created with make_config.
+        games_per_pair (int): The number of games each pair of configurations plays.
+        seed (int): The seed of the whole tournament (default is 0).
+        workers (int): The number of worker processes (default is one per core).
+        verbose (bool): A flag indicating whether each game and the summary should be printed (default is True).
+        record_path (str): A game record file every game is appended to (default is None, no records).
+        board (tuple): The row count, column count and win length of the games (default is the standard 6x7 connect 4).
+        opening_plies (int): The number of seeded random moves each game starts with (default is 4).
+
+    Returns:
+        dict: The summary computed by summarize, plus the per-game results and the wall time.
+    """
+    start_time = time.time()
+    results = []
+    writer = GameRecordWriter(record_path, board[0], board[1], win_length=board[2]) if record_path else None
+    for result in iter_games(configs, games_per_pair, seed, workers, writer is not None, board, opening_plies):
+        record = result.pop('record')
+        if writer is not None:
+            writer.write_record(*record)  # Records are written by this process only
+        results.append(result)
+        if verbose:
+            print(f"Game {result['game']}: {result['player1']} vs {result['player2']}, "
+                  f"winner {result['winner'] or 'draw'} in {result['moves']} moves")
+    if writer is not None:
+        writer.close()
+    summary = summarize(results)
+    summary['games'] = sorted(results, key=lambda result: result['game'])
+    summary['wall_time'] = time.time() - start_time
+    if verbose:
+        print_summary(summary)
+    return summary
+
+
+def print_summary(summary):
+    """Print the head-to-head statistics and speeds of a tournament summary."""
+    for pair, stats in summary['pairs'].items():
+        print(f"{pair} ({stats['games']} games)")
+        for outcome in ('win', 'draw', 'loss'):
+            low, high = stats[f'{outcome}_interval']
+            print(f"  {outcome.capitalize()} rate: {round(100 * stats[f'{outcome}_rate'], 1)}% "
+                  f"[{round(100 * low, 1)}%, {round(100 * high, 1)}%]")
+        low, high = stats['elo_interval']
+        print(f"  Elo difference: {round(stats['elo'], 1)} [{round(low, 1)}, {round(high, 1)}]")
+    for name, nodes_per_second in summary['nodes_per_second'].items():
+        print(f"{name}: {round(nodes_per_second)} nodes/second")
+    print(f"Wall time: {round(summary['wall_time'], 2)} seconds")
+
+
+if __name__ == "__main__":
+    run_tournament([make_config('Hard depth 5'), make_config('Hard depth 3', depth=3),
+                    make_config('PVS depth 5', search='pvs')], games_per_pair=20)
@@ -0,0 +1,184 @@
+EXACT = 0  # Stored score is the exact minimax value
+LOWER = 1  # Stored score is a lower bound (the search failed high)
+UPPER = 2  # Stored score is an upper bound (the search failed low)
+
+
+class TranspositionTable:
+    """Class representing a bounded transposition table keyed by Zobrist hash.
+
+    The table is split into buckets of two slots: a depth-preferred slot that
+    keeps the deepest search seen for the bucket, and an always-replace slot
+    that takes every other entry. Entries are ``(key, depth, score, flag,
+    move)`` tuples.
+    """
+
+    ENTRY_SIZE = 160  # Approximate bytes taken by one stored entry and its slot
+
+    def __init__(self, memory_mb=16):
+        """Initialize the table with room for roughly memory_mb megabytes of entries."""
+        self.bucket_count = max(1, int(memory_mb * 1024 * 1024) // (2 * self.ENTRY_SIZE))  # Number of two-slot buckets
+        self.deep = [None] * self.bucket_count  # Depth-preferred slots
+        self.recent = [None] * self.bucket_count  # Always-replace slots
+        self.hits = 0  # Number of probes that found the position
+        self.misses = 0  # Number of probes that did not find the position
+        self.stores = 0  # Number of search results stored
+        self.overwrites = 0  # Number of stores that evicted a different position
+
+    def probe(self, key):
+        """Return the entry stored for the key, or None."""
+        index = key % self.bucket_count
+        entry = self.deep[index]
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry
+        entry = self.recent[index]
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry
+        self.misses += 1
+        return None
+
+    def store(self, key, depth, score, flag, move):
+        """Store a search result, replacing older entries in the key's bucket."""
+        self.stores += 1
+        index = key % self.bucket_count
+        entry = (key, depth, score, flag, move)
+        deep = self.deep[index]
+        if deep is None or deep[0] == key or depth >= deep[1]:  # Deeper (or same) searches take the depth-preferred slot
+            if deep is not None and deep[0] != key:
+                recent = self.recent[index]
+                if recent is not None and recent[0] != deep[0]:
+                    self.overwrites += 1
+                self.recent[index] = deep  # Demote the old deep entry instead of dropping it
+            self.deep[index] = entry
+        else:
+            recent = self.recent[index]
+            if recent is not None and recent[0] != key:
+                self.overwrites += 1
+            self.recent[index] = entry
+
+    def best_move(self, key):
+        """Return the best move stored for the key without counting a probe, or None."""
+        index = key % self.bucket_count
+        for entry in (self.deep[index], self.recent[index]):
+            if entry is not None and entry[0] == key:
+                return entry[4]
+        return None
+
+    def clear(self):
+        """Remove every entry from the table."""
+        self.deep = [None] * self.bucket_count
+        self.recent = [None] * self.bucket_count
+
+    def get_stats(self):
+        """Return the counts since the last reset, with hit and miss rates per probe and the overwrite rate per store."""
+        probes = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'stores': self.stores, 'overwrites': self.overwrites,
+                'hit_rate': self.hits / probes if probes else 0.0,
+                'miss_rate': self.misses / probes if probes else 0.0,
+                'overwrite_rate': self.overwrites / self.stores if self.stores else 0.0}
+
+    def reset_stats(self):
+        """Reset the hit, miss, store and overwrite counters."""
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.overwrites = 0
+
+
+class SharedTranspositionTable(TranspositionTable):
+    """Class representing a transposition table kept in shared memory for several processes.
+
+    Every slot is two 64-bit words: the packed entry and the key XOR the packed
+    entry. Writes are not locked; a slot torn by two processes writing at once
+    fails the key check and reads as a miss. Hit, miss, store and overwrite
+    counts are local to each process.
+    """
+
+    SCORE_LIMIT = 1 << 40  # Encoded value of an infinite score
+    SCORE_OFFSET = 1 << 41  # Offset keeping encoded scores positive
+
+    def __init__(self, memory_mb=16, array=None):
+        """Initialize the table in a new shared array, or attach to the array of another table."""
+        if array is None:
+            from multiprocessing.sharedctypes import RawArray
+            array = RawArray('q', 4 * max(1, int(memory_mb * 1024 * 1024) // 32))  # Two slots of two words per bucket
+        self.array = array  # Shared words: deep data, deep check, recent data, recent check
+        self.bucket_count = len(array) // 4  # Number of two-slot buckets
+        self.hits = 0  # Number of probes that found the position
+        self.misses = 0  # Number of probes that did not find the position
+        self.stores = 0  # Number of search results stored
+        self.overwrites = 0  # Number of stores that evicted a different position
+
+    def pack(self, depth, score, flag, move):
+        """Pack an entry into a single positive 64-bit word."""
+        if score == float('inf'):
+            score = self.SCORE_LIMIT
+        elif score == float('-inf'):
+            score = -self.SCORE_LIMIT
+        move = 0 if move is None else move + 1
+        return ((int(score) + self.SCORE_OFFSET) << 18) | (move << 10) | (flag << 8) | depth
+
+    def unpack(self, key, data):
+        """Unpack a word into an entry tuple."""
+        score = (data >> 18) - self.SCORE_OFFSET
+        if score == self.SCORE_LIMIT:
+            score = float('inf')
+        elif score == -self.SCORE_LIMIT:
+            score = float('-inf')
+        move = (data >> 10) & 0xFF
+        return key, data & 0xFF, score, (data >> 8) & 0x3, move - 1 if move else None
+
+    def read(self, slot, key):
+        """Return the entry in the slot if it holds the key, or None."""
+        data = self.array[slot]
+        if data and self.array[slot + 1] ^ data == key >> 1:  # Keys are 64-bit, words are signed 63-bit
+            return self.unpack(key, data)
+        return None
+
+    def probe(self, key):
+        """Return the entry stored for the key, or None."""
+        index = 4 * (key % self.bucket_count)
+        entry = self.read(index, key)
+        if entry is None:
+            entry = self.read(index + 2, key)
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    def store(self, key, depth, score, flag, move):
+        """Store a search result, replacing older entries in the key's bucket."""
+        self.stores += 1
+        array = self.array
+        index = 4 * (key % self.bucket_count)
+        check = key >> 1
+        data = self.pack(depth, score, flag, move)
+        deep = array[index]
+        deep_check = array[index + 1] ^ deep
+        if not deep or deep_check == check or depth >= deep & 0xFF:  # Deeper (or same) searches take the depth-preferred slot
+            if deep and deep_check != check:
+                if array[index + 2] and array[index + 3] ^ array[index + 2] != deep_check:
+                    self.overwrites += 1
+                array[index + 2] = deep  # Demote the old deep entry instead of dropping it
+                array[index + 3] = deep_check ^ deep
+            array[index] = data
+            array[index + 1] = check ^ data
+        else:
+            recent = array[index + 2]
+            if recent and array[index + 3] ^ recent != check:
+                self.overwrites += 1
+            array[index + 2] = data
+            array[index + 3] = check ^ data
+
+    def best_move(self, key):
+        """Return the best move stored for the key without counting a probe, or None."""
+        index = 4 * (key % self.bucket_count)
+        entry = self.read(index, key) or self.read(index + 2, key)
+        return entry[4] if entry is not None else None
+
+    def clear(self):
+        """Remove every entry from the table."""
+        for index in range(len(self.array)):
+            self.array[index] = 0